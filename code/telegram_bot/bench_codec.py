@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark of getUpdates batch decoding: the old str-decoding path against the
+codec module (orjson when installed, stdlib otherwise).
+
+Usage: python bench_codec.py [batch_size] [iterations]
+"""
+import json
+import sys
+import timeit
+import urllib.parse
+
+from ngonnest_bot import codec
+
+
+def make_batch(size: int) -> bytes:
+    """Build a raw getUpdates response with ``size`` text message updates."""
+    updates = []
+    for i in range(size):
+        updates.append({
+            "update_id": 100000 + i,
+            "message": {
+                "message_id": i,
+                "from": {"id": 5000 + i, "is_bot": False, "first_name": "Utilisateur",
+                         "username": f"user_{i}", "language_code": "fr"},
+                "chat": {"id": 5000 + i, "first_name": "Utilisateur", "type": "private"},
+                "date": 1700000000 + i,
+                "text": "L'application plante quand j'ajoute un produit à l'inventaire 🐛",
+            },
+        })
+    return json.dumps({"ok": True, "result": updates}).encode("utf-8")
+
+
+def bench(label: str, func, iterations: int) -> float:
+    best = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations
+    print(f"  {label:<40} {best * 1e6:10.1f} µs")
+    return best
+
+
+def main() -> int:
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    raw = make_batch(batch_size)
+    message = {"chat_id": 123456789, "text": "✅ *Bug signalé avec succès !*\n\n📋 #42",
+               "parse_mode": "Markdown"}
+
+    print(f"🔍 JSON codec benchmark (backend: {codec.BACKEND})")
+    print(f"📦 {batch_size} updates per batch, {len(raw)} bytes")
+    print("=" * 60)
+
+    print("\n📥 Decode getUpdates batch:")
+    old = bench("json.loads(raw.decode('utf-8'))", lambda: json.loads(raw.decode("utf-8")), iterations)
+    new = bench(f"codec.loads(raw) [{codec.BACKEND}]", lambda: codec.loads(raw), iterations)
+    print(f"  → speedup x{old / new:.2f}")
+
+    print("\n📤 Encode sendMessage body:")
+    old = bench("urlencode(data).encode('utf-8')",
+                lambda: urllib.parse.urlencode(message).encode("utf-8"), iterations * 50)
+    new = bench(f"codec.dumps(data) [{codec.BACKEND}]", lambda: codec.dumps(message), iterations * 50)
+    print(f"  → speedup x{old / new:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
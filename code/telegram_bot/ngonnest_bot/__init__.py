@@ -0,0 +1,38 @@
+"""
+NgonNest Telegram bot core.
+
+One implementation of routing, conversation state and the outbound pipeline,
+with thin transports for each deployment mode:
+
+- ``PollingTransport``: long polling (``python main.py``, Railway/Render/VPS)
+- ``WebhookServer``: standalone webhook server (``BOT_MODE=webhook``)
+- ``WebhookEndpoint``: request fast path used by the serverless ``api/bot.py``
+"""
+from .client import TelegramClient
+from .core import BotCore
+from .dedup import DedupBackend, RedisDedupBackend, UpdateDeduplicator
+from .github import GitHubIssueManager
+from .leader import FileLeaseBackend, LeaderElector, LeaseBackend, elector_from_env
+from .polling import PollingTransport
+from .scheduler import OutboundScheduler
+from .tenancy import BotHost
+from .webhook import WebhookEndpoint, WebhookServer, process_webhook
+
+__all__ = [
+    "BotCore",
+    "BotHost",
+    "DedupBackend",
+    "FileLeaseBackend",
+    "GitHubIssueManager",
+    "LeaderElector",
+    "LeaseBackend",
+    "OutboundScheduler",
+    "PollingTransport",
+    "RedisDedupBackend",
+    "TelegramClient",
+    "UpdateDeduplicator",
+    "WebhookEndpoint",
+    "WebhookServer",
+    "elector_from_env",
+    "process_webhook",
+]
@@ -0,0 +1,237 @@
+"""
+Announcement broadcasts to subscribers.
+
+A broadcast runs in a background thread, so update handling is never blocked.
+Recipients are streamed from the subscriber file in chunks. The sends of a
+chunk are paced by a token bucket and kept in flight concurrently, so the
+configured rate is reached even with a slow API round trip. Progress is saved
+to a state file after each chunk, and an interrupted broadcast resumes from
+there when the bot restarts. Users who blocked the bot (403) are unsubscribed
+as the broadcast goes; 429 answers are retried after Telegram's
+``retry_after``.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .client import TelegramClient
+from .scheduler import TokenBucket
+from .subscribers import SubscriberStore
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcaster:
+    """Sends one broadcast at a time at up to ``rate`` messages per second."""
+
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, client: TelegramClient, store: SubscriberStore, state_path: str,
+                 rate: float = 25.0, chunk_size: int = 50, concurrency: int = 8):
+        self.client = client
+        self.store = store
+        self.state_path = state_path
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._halt = threading.Event()
+        self._cancelled = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def start(self, text: str, admin_chat_id: int) -> bool:
+        """Start a new broadcast. Return False if one is already running."""
+        with self._lock:
+            if self.running or os.path.exists(self.state_path):
+                return False
+            state = {"text": text, "admin_chat_id": admin_chat_id, "offset": 0,
+                     "sent": 0, "blocked": 0, "failed": 0, "started_at": time.time()}
+            self._save_state(state)
+            self._spawn(state)
+            return True
+
+    def resume(self) -> bool:
+        """Resume a broadcast interrupted by a crash or restart, if any."""
+        with self._lock:
+            if self.running or not os.path.exists(self.state_path):
+                return False
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            logger.info(f"[{self.client.name}] Resuming broadcast at subscriber #{state['offset']}")
+            self._spawn(state)
+            return True
+
+    def _remove_state(self) -> bool:
+        try:
+            os.remove(self.state_path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def cancel(self) -> bool:
+        """Stop the current broadcast and forget its progress. Does not wait for the worker."""
+        with self._lock:
+            if self.running:
+                # The worker owns the state file: it deletes it on its way out,
+                # after its last save, so the broadcast can't come back on restart.
+                self._cancelled = True
+                self._halt.set()
+                return True
+            # Nothing running (e.g. not resumed yet on this instance): drop the saved progress.
+            return self._remove_state()
+
+    def stop(self) -> None:
+        """Pause the current broadcast, keeping its progress for ``resume``."""
+        with self._lock:
+            self._halt.set()
+            thread = self._thread
+        if thread:
+            # The worker waits for the sends already in flight and prunes the chats
+            # that blocked the bot. The unfinished chunk is sent again by whoever
+            # resumes, so a few chats of that chunk may get the message twice.
+            thread.join(timeout=10)
+
+    def _spawn(self, state: Dict[str, Any]) -> None:
+        self._halt.clear()
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, args=(state,),
+                                        name=f"broadcast-{self.client.name}", daemon=True)
+        self._thread.start()
+
+    def _send(self, chat_id: int, text: str) -> Tuple[str, Optional[float]]:
+        """Deliver to one chat. Returns the outcome and, for "retry", Telegram's retry_after.
+
+        Outcomes are "sent", "blocked", "failed" or "retry".
+        """
+        result, error_code, retry_after = self.client.request("sendMessage", {
+            "chat_id": chat_id, "text": text, "parse_mode": "Markdown",
+        })
+        if result is not None:
+            return "sent", None
+        if error_code == 403:
+            return "blocked", None
+        if error_code == 400:
+            return "failed", None
+        # 429, server or network error.
+        return "retry", retry_after
+
+    def _submit(self, executor: Optional[ThreadPoolExecutor], chat_id: int, text: str) -> Future:
+        if self.client.scheduler:
+            # Shared scheduler: stay fair to the other bots in the process.
+            return self.client.scheduler.submit(self.client.name, self._send, chat_id, text)
+        return executor.submit(self._send, chat_id, text)
+
+    def _take_token(self, bucket: TokenBucket) -> bool:
+        """Wait for the rate limiter. Return False if the broadcast was halted meanwhile."""
+        while not bucket.try_take(time.monotonic()):
+            if self._halt.wait(bucket.wait_time()):
+                return False
+        return not self._halt.is_set()
+
+    def _send_chunk(self, executor: Optional[ThreadPoolExecutor], bucket: TokenBucket,
+                    chat_ids: List[int], state: Dict[str, Any]) -> Tuple[List[int], bool]:
+        """Send one chunk, retrying transient failures.
+
+        Returns the chats that blocked the bot and whether the chunk was done
+        (False if the broadcast was halted meanwhile). On halt, the sends
+        already submitted are waited for, so their outcomes are not lost.
+        """
+        blocked = []
+        pending = chat_ids
+        attempt = 0
+        while pending:
+            futures = []
+            halted = False
+            for chat_id in pending:
+                if not self._take_token(bucket):
+                    halted = True
+                    break
+                futures.append((chat_id, self._submit(executor, chat_id, state["text"])))
+
+            retry, delay = [], 0.0
+            for chat_id, future in futures:
+                try:
+                    outcome, retry_after = future.result()
+                except Exception as e:
+                    logger.error(f"[{self.client.name}] Broadcast send to {chat_id} failed: {e}")
+                    outcome, retry_after = "retry", None
+                if outcome == "retry":
+                    retry.append(chat_id)
+                    delay = max(delay, retry_after or 2 ** attempt)
+                    continue
+                state[outcome] += 1
+                if outcome == "blocked":
+                    blocked.append(chat_id)
+            if halted:
+                return blocked, False
+
+            attempt += 1
+            if retry and attempt >= self.MAX_ATTEMPTS:
+                state["failed"] += len(retry)
+                break
+            pending = retry
+            # Flood control applies to the whole bot: pause every send, not just these chats.
+            if pending and self._halt.wait(delay):
+                return blocked, False
+        return blocked, True
+
+    def _run(self, state: Dict[str, Any]) -> None:
+        bucket = TokenBucket(self.rate)
+        executor = None
+        if not self.client.scheduler:
+            executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                          thread_name_prefix=f"broadcast-{self.client.name}")
+        try:
+            for next_offset, chat_ids in self.store.iter_chunks(state["offset"], self.chunk_size):
+                blocked, done = self._send_chunk(executor, bucket, chat_ids, state)
+                if blocked:
+                    self.store.remove_many(blocked)
+                if not done:
+                    if self._cancelled:
+                        self._remove_state()
+                        logger.info(f"[{self.client.name}] Broadcast cancelled")
+                    else:
+                        logger.info(f"[{self.client.name}] Broadcast paused at subscriber #{state['offset']}")
+                    return
+                state["offset"] = next_offset
+                self._save_state(state)
+        except Exception as e:
+            if self._cancelled:
+                self._remove_state()
+            else:
+                # Keep the state file: the broadcast resumes on the next start.
+                logger.error(f"[{self.client.name}] Broadcast interrupted: {e}")
+            return
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+        self._remove_state()
+        self.store.compact()
+        duration = int(time.time() - state["started_at"])
+        logger.info(f"[{self.client.name}] Broadcast done: {state['sent']} sent, "
+                    f"{state['blocked']} blocked, {state['failed']} failed in {duration}s")
+        self.client.send_message(
+            state["admin_chat_id"],
+            "📣 *Diffusion terminée*\n\n"
+            f"✅ Envoyés : {state['sent']}\n"
+            f"🚫 Bloqués (désabonnés) : {state['blocked']}\n"
+            f"❌ Échecs : {state['failed']}\n"
+            f"⏱️ Durée : {duration}s",
+        )
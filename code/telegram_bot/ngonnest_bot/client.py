@@ -0,0 +1,95 @@
+"""
+Telegram Bot API client: the outbound half of the pipeline.
+
+All transports send through this class, so request encoding, error handling
+and scheduling live in one place.
+"""
+import logging
+from typing import Any, Dict, NamedTuple, Optional
+
+import requests
+
+from . import codec
+from .profiling import profiler
+from .retry_queue import RetryQueue, is_retryable
+from .scheduler import OutboundScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ApiResponse(NamedTuple):
+    """Outcome of one Bot API call; ``result`` is None on failure."""
+    result: Any
+    error_code: Optional[int] = None
+    retry_after: Optional[float] = None  # seconds, sent by Telegram with 429 errors
+
+
+class TelegramClient:
+    """Thin wrapper over the Bot API using a (possibly shared) requests session."""
+
+    # Calls worth delivering late; others (e.g. answerCallbackQuery) expire quickly.
+    RETRY_METHODS = ("sendMessage",)
+
+    def __init__(self, token: str, name: str = "default",
+                 session: Optional[requests.Session] = None,
+                 scheduler: Optional[OutboundScheduler] = None):
+        self.token = token
+        self.name = name
+        self.base_url = f"https://api.telegram.org/bot{token}"
+        self.session = session or requests.Session()
+        self.scheduler = scheduler
+        self.retry_queue: Optional[RetryQueue] = None
+        if scheduler:
+            scheduler.register(name)
+
+    def request(self, method: str, data: Optional[Dict[str, Any]] = None,
+                timeout: float = 30) -> ApiResponse:
+        """Make an API call to Telegram, returning ``(result, error_code, retry_after)``."""
+        url = f"{self.base_url}/{method}"
+        try:
+            with profiler.stage("fetch" if method == "getUpdates" else "send"):
+                body = codec.dumps(data) if data else None
+                response = self.session.post(url, data=body, headers=codec.JSON_HEADERS, timeout=timeout)
+            with profiler.stage("decode"):
+                result = codec.loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"[{self.name}] Network Error: {e}")
+            return ApiResponse(None)
+        if result.get("ok"):
+            return ApiResponse(result.get("result"))
+        error_code = result.get("error_code", response.status_code)
+        retry_after = (result.get("parameters") or {}).get("retry_after")
+        logger.error(f"[{self.name}] API Error {error_code}: {result.get('description')}")
+        return ApiResponse(None, error_code, retry_after)
+
+    def api_call(self, method: str, data: Optional[Dict[str, Any]] = None, timeout: float = 30):
+        """Make an API call to Telegram."""
+        return self.request(method, data, timeout).result
+
+    def _deliver(self, method: str, data: Dict[str, Any]):
+        result, error_code, retry_after = self.request(method, data)
+        if (result is None and self.retry_queue is not None
+                and method in self.RETRY_METHODS and is_retryable(error_code)):
+            self.retry_queue.enqueue(method, data, retry_after=retry_after)
+        return result
+
+    def send(self, method: str, data: Dict[str, Any]):
+        """Send an outgoing call, through the scheduler when one is attached.
+
+        Transient failures are handed to the retry queue, if any, instead of being lost.
+        """
+        if self.scheduler:
+            # Profiler stacks are per thread: carry the sampled path to the worker.
+            return self.scheduler.submit(self.name, self._deliver_scheduled, profiler.context(), method, data)
+        return self._deliver(method, data)
+
+    def _deliver_scheduled(self, profile_context: Optional[str], method: str, data: Dict[str, Any]):
+        with profiler.carried(profile_context, "outbound"):
+            return self._deliver(method, data)
+
+    def send_message(self, chat_id: int, text: str, parse_mode: str = "Markdown",
+                     reply_markup: Optional[Dict[str, Any]] = None):
+        data = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+        if reply_markup:
+            data["reply_markup"] = reply_markup
+        return self.send("sendMessage", data)
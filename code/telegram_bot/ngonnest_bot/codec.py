@@ -0,0 +1,53 @@
+"""
+JSON codec used on the bot's hot paths.
+
+Uses orjson when it is installed (``pip install orjson``) and falls back to the
+standard library otherwise. Both backends decode raw bytes directly, so callers
+should pass ``response.content`` / request bodies without decoding them to str
+first. ``dumps`` always returns UTF-8 bytes ready to be sent as a request body.
+"""
+import json
+import re
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson else "json"
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+if orjson:
+    def loads(data: bytes) -> Any:
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+
+def has_key(body: bytes, key: str) -> bool:
+    """Cheap check for a top-level-looking ``"key"`` token in a raw JSON body.
+
+    A quoted key can't appear verbatim inside a JSON string value (its quotes
+    would be escaped), so a miss means the full body doesn't need decoding.
+    """
+    return f'"{key}"'.encode("utf-8") in body
+
+
+_UPDATE_ID = re.compile(rb'"update_id"\s*:\s*(\d+)')
+
+
+def peek_update_id(body: bytes) -> Optional[int]:
+    """Extract ``update_id`` from a raw update without decoding the whole body."""
+    match = _UPDATE_ID.search(body)
+    return int(match.group(1)) if match else None
@@ -0,0 +1,553 @@
+"""
+Transport-independent bot core: routing, conversation state and handlers.
+
+Every deployment mode (long polling, standalone webhook server, serverless
+handler) feeds raw updates to ``BotCore.handle_update``; replies go out
+through the core's ``TelegramClient``.
+"""
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .broadcast import Broadcaster
+from .client import TelegramClient
+from .events import EventLog
+from .github import GitHubIssueManager
+from .profiling import profiler
+from .retry_queue import RetryQueue
+from .subscribers import SubscriberStore
+
+logger = logging.getLogger(__name__)
+
+
+class BotCore:
+    """NgonNest bot logic shared by all transports."""
+
+    DEFAULT_LABELS: Dict[str, list] = {
+        "feedback": ["feedback", "user-request", "enhancement"],
+        "bug": ["bug"],
+    }
+
+    DEFAULT_TEMPLATES: Dict[str, str] = {
+        "start": (
+            "🏠 *Bienvenue sur NgonNest Bot !*\n\n"
+            "Je peux vous aider avec :\n"
+            "• `/feedback` - Partager vos suggestions\n"
+            "• `/bug` - Signaler un problème\n"
+            "• `/help` - Voir toutes les commandes\n\n"
+            "Utilisez ces commandes pour nous aider à améliorer l'application !"
+        ),
+        "help": (
+            "🤖 *Commandes NgonNest Bot*\n\n"
+            "*Feedback & Support :*\n"
+            "• `/feedback` - Envoyer une suggestion d'amélioration\n"
+            "• `/bug` - Signaler un bug ou problème\n\n"
+            "*Informations :*\n"
+            "• `/help` - Afficher cette aide\n"
+            "• `/status` - État du bot et GitHub\n"
+            "• `/subscribe` - Recevoir les annonces (nouvelles versions, incidents)\n"
+            "• `/unsubscribe` - Ne plus recevoir les annonces\n\n"
+            "*Astuce :* Vous pouvez annuler une commande en cours avec `/cancel`, "
+            "ou tout écrire en une fois : `/bug L'application plante au démarrage`"
+        ),
+        "quickstart": (
+            "🚀 *Démarrage rapide*\n\n"
+            "1. Tapez `/feedback` pour proposer une amélioration, ou `/bug` pour signaler un problème\n"
+            "2. Décrivez-le dans votre message suivant, ou directement après la commande\n"
+            "3. Vous recevez un numéro de suivi GitHub\n\n"
+            "_Utilisez /cancel pour annuler à tout moment._"
+        ),
+        "faq": (
+            "❓ *FAQ NgonNest Bot*\n\n"
+            "*Q : Comment utiliser le bot ?*\n"
+            "R : Cliquez sur les boutons ci-dessous ou tapez des commandes !\n\n"
+            "*Q : Que devient mon message ?*\n"
+            "R : Il est transmis à l'équipe sous forme d'issue GitHub, avec un numéro de suivi."
+        ),
+        "feedback_inline": (
+            "💡 *Envoyer un feedback*\n\n"
+            "Écrivez votre suggestion sur la même ligne que la commande :\n"
+            "`/feedback Il serait pratique d'avoir une recherche dans l'inventaire`"
+        ),
+        "bug_inline": (
+            "🐛 *Signaler un bug*\n\n"
+            "Décrivez le problème sur la même ligne que la commande :\n"
+            "`/bug L'application plante quand j'ouvre l'inventaire`"
+        ),
+        "unknown": (
+            "❓ *Commande inconnue*\n\n"
+            "Utilisez `/help` pour voir toutes les commandes disponibles."
+        ),
+    }
+
+    # Inline keyboards sent with the matching template (button -> callback data).
+    DEFAULT_KEYBOARDS: Dict[str, list] = {
+        "start": [
+            [("📋 Commandes", "help"), ("🚀 Quick Start", "quickstart")],
+            [("❓ FAQ", "faq")],
+        ],
+        "help": [[("🏠 Menu principal", "start")]],
+        "quickstart": [[("📋 Toutes les commandes", "help")], [("🏠 Retour au menu", "start")]],
+        "faq": [[("🚀 Guide rapide", "quickstart")], [("🏠 Menu principal", "start")]],
+        "unknown": [[("📋 Liste commandes", "help")], [("🏠 Menu principal", "start")]],
+    }
+
+    # Buttons that behave like the command of the same name.
+    CALLBACK_COMMANDS = ("start", "help", "status")
+    # Buttons that only show a template.
+    CALLBACK_TEMPLATES = ("quickstart", "faq")
+
+    def __init__(self, client: TelegramClient, github: Optional[GitHubIssueManager] = None,
+                 labels: Optional[Dict[str, list]] = None,
+                 templates: Optional[Dict[str, str]] = None,
+                 admin_ids: Iterable[int] = (),
+                 data_dir: Optional[str] = None):
+        self.client = client
+        self.name = client.name
+        self.github = github or GitHubIssueManager(session=client.session)
+        self.labels = {**self.DEFAULT_LABELS, **(labels or {})}
+        self.templates = {**self.DEFAULT_TEMPLATES, **(templates or {})}
+        self.user_states: Dict[int, str] = {}
+        self.report_started: Dict[int, float] = {}
+        self.admin_ids = set(admin_ids)
+        self.data_dir = data_dir
+        # Multi-message conversations (/feedback, then the text) keep state in memory.
+        # Serverless instances (no data_dir) don't share or keep memory between
+        # calls, so there only the one-message form "/feedback <text>" is offered.
+        self.conversations = data_dir is not None
+
+        # Features needing persistent storage are only enabled for long-running
+        # deployments that provide a data directory.
+        self.subscribers: Optional[SubscriberStore] = None
+        self.broadcaster: Optional[Broadcaster] = None
+        self.events: Optional[EventLog] = None
+        if data_dir:
+            self.subscribers = SubscriberStore(os.path.join(data_dir, "subscribers.bin"))
+            self.broadcaster = Broadcaster(client, self.subscribers,
+                                           os.path.join(data_dir, "broadcast.json"))
+            client.retry_queue = RetryQueue(client.request, os.path.join(data_dir, "outbox.json"),
+                                            name=client.name)
+            self.events = EventLog(os.path.join(data_dir, "events"))
+
+    @classmethod
+    def from_env(cls, data_dir: Optional[str] = None) -> "BotCore":
+        """Build the single-bot core from TELEGRAM_TOKEN / GITHUB_* / ADMIN_IDS."""
+        token = os.getenv("TELEGRAM_TOKEN")
+        if not token:
+            raise ValueError("TELEGRAM_TOKEN environment variable not set!")
+        return cls(TelegramClient(token), admin_ids=parse_admin_ids(os.getenv("ADMIN_IDS")),
+                   data_dir=data_dir)
+
+    def is_admin(self, user_id: int) -> bool:
+        return user_id in self.admin_ids
+
+    def resume_background_jobs(self):
+        """Restart work interrupted by a previous shutdown (call once this instance is active)."""
+        if self.events is not None:
+            # Catch up with events written by the previous active instance.
+            self.events.activate()
+        if self.subscribers is not None:
+            # Same for the subscribers added or removed while this instance was standby.
+            self.subscribers.reload()
+        if self.client.retry_queue is not None:
+            self.client.retry_queue.start()
+        if self.broadcaster:
+            self.broadcaster.resume()
+
+    def stop_background_jobs(self):
+        """Stop work owned by the active instance, e.g. after losing leadership.
+
+        Progress stays on disk, so whichever instance becomes active resumes it.
+        """
+        if self.broadcaster:
+            self.broadcaster.stop()
+        if self.client.retry_queue is not None:
+            self.client.retry_queue.stop()
+        if self.events is not None:
+            self.events.deactivate()
+
+    def handle_update(self, update: Dict[str, Any]):
+        """Dispatch a single decoded update."""
+        with profiler.stage("route"):
+            handlers = []
+            message = update.get("message")
+            if message and (message.get("text") or "").startswith("/"):
+                handlers.append((self.handle_command, message))
+            elif message:
+                handlers.append((self.handle_message, message))
+            callback_query = update.get("callback_query")
+            if callback_query:
+                handlers.append((self.handle_callback_query, callback_query))
+        with profiler.stage("handler"):
+            for handler, payload in handlers:
+                handler(payload)
+
+    def send_template(self, chat_id: int, name: str):
+        """Send a template with its inline keyboard, if it has one."""
+        keyboard = self.DEFAULT_KEYBOARDS.get(name)
+        reply_markup = None
+        if keyboard:
+            reply_markup = {"inline_keyboard": [
+                [{"text": text, "callback_data": data} for text, data in row] for row in keyboard
+            ]}
+        self.client.send_message(chat_id, self.templates[name], reply_markup=reply_markup)
+
+    def handle_callback_query(self, callback_query: Dict[str, Any]):
+        """Route inline keyboard buttons ("start", "help", "faq", ...)."""
+        message = callback_query.get("message")
+        data = callback_query.get("data") or ""
+        if message and data in self.CALLBACK_COMMANDS:
+            self.handle_command({
+                "chat": message["chat"],
+                "from": callback_query["from"],
+                "text": f"/{data}",
+            })
+        elif message and data in self.CALLBACK_TEMPLATES:
+            self.send_template(message["chat"]["id"], data)
+        self.client.send("answerCallbackQuery", {"callback_query_id": callback_query["id"]})
+
+    def handle_command(self, message: Dict[str, Any]):
+        text = message.get("text", "") or ""
+        chat_id = message["chat"]["id"]
+        user_id = message["from"]["id"]
+
+        if self.events is not None:
+            self.events.record_command(text.split()[0][1:].split("@")[0].lower())
+
+        if text.startswith("/start"):
+            self.send_template(chat_id, "start")
+        elif text.startswith("/help"):
+            self.send_template(chat_id, "help")
+        elif text.startswith("/status"):
+            github_ok = self.github.github_token is not None
+            status = "🟢 En ligne" if github_ok else "🟡 GitHub désactivé"
+            github_status = "✅ Connecté" if github_ok else "❌ Token manquant"
+            stats_hint = ""
+            if self.events is not None and self.is_admin(user_id):
+                stats_hint = "\n\n📈 Statistiques d'usage : `/stats`"
+            self.client.send_message(
+                chat_id,
+                f"📊 *État du Bot NgonNest*\n\n"
+                f"🤖 Bot: {status}\n"
+                f"🐙 GitHub: {github_status}\n"
+                f"📝 Repo: `{self.github.github_repo}`\n\n"
+                f"*Integration active:* {'Oui' if github_ok else 'Non (nécessite GITHUB_TOKEN)'}"
+                f"{stats_hint}",
+            )
+        elif text.startswith("/cancel"):
+            if user_id in self.user_states:
+                operation = self.user_states[user_id]
+                del self.user_states[user_id]
+                self.report_started.pop(user_id, None)
+                self.client.send_message(
+                    chat_id,
+                    f"❌ Opération *{operation}* annulée.\n\n"
+                    "Vous pouvez recommencer avec `/feedback` ou `/bug`.",
+                )
+            else:
+                self.client.send_message(
+                    chat_id,
+                    "ℹ️ Aucune opération en cours.\n\n"
+                    "Utilisez `/feedback` ou `/bug` pour commencer.",
+                )
+        elif text.startswith("/feedback") and _command_args(text):
+            self.process_feedback(chat_id, message["from"], _command_args(text))
+        elif text.startswith("/feedback") and not self.conversations:
+            self.client.send_message(chat_id, self.templates["feedback_inline"])
+        elif text.startswith("/feedback"):
+            self.user_states[user_id] = "feedback"
+            self.report_started[user_id] = time.monotonic()
+            self.client.send_message(
+                chat_id,
+                "💡 *Envoyer un feedback*\n\n"
+                "Pouvez-vous me décrire votre suggestion ou idée d'amélioration ?\n\n"
+                "📝 *Exemple :* \"Il serait pratique d'avoir une fonction de recherche dans l'inventaire.\"\n\n"
+                "_Tapez votre message ou utilisez /cancel pour annuler._",
+            )
+        elif text.startswith("/bug") and _command_args(text):
+            self.process_bug_report(chat_id, message["from"], _command_args(text))
+        elif text.startswith("/bug") and not self.conversations:
+            self.client.send_message(chat_id, self.templates["bug_inline"])
+        elif text.startswith("/bug"):
+            self.user_states[user_id] = "bug"
+            self.report_started[user_id] = time.monotonic()
+            self.client.send_message(
+                chat_id,
+                "🐛 *Signaler un bug*\n\n"
+                "Pouvez-vous me décrire le problème rencontré ?\n\n"
+                "📝 *Détails utiles :*\n"
+                "• Ce qui s'est passé\n"
+                "• Quand cela arrive\n"
+                "• Sur quel appareil\n"
+                "• Étapes pour reproduire\n\n"
+                "_Tapez votre description ou utilisez /cancel pour annuler._",
+            )
+        elif text.startswith("/subscribe") and self.subscribers is not None:
+            if self.subscribers.add(chat_id):
+                reply = "🔔 *Abonnement activé !*\n\nVous recevrez les annonces NgonNest (nouvelles versions, incidents)."
+            else:
+                reply = "ℹ️ Vous êtes déjà abonné aux annonces."
+            self.client.send_message(chat_id, reply + "\n\nUtilisez `/unsubscribe` pour vous désabonner.")
+        elif text.startswith("/unsubscribe") and self.subscribers is not None:
+            if self.subscribers.remove(chat_id):
+                reply = "🔕 *Abonnement désactivé.*\n\nVous ne recevrez plus les annonces."
+            else:
+                reply = "ℹ️ Vous n'êtes pas abonné aux annonces."
+            self.client.send_message(chat_id, reply)
+        elif text.startswith("/broadcast_cancel") and self.broadcaster and self.is_admin(user_id):
+            if self.broadcaster.cancel():
+                self.client.send_message(chat_id, "🛑 Diffusion annulée.")
+            else:
+                self.client.send_message(chat_id, "ℹ️ Aucune diffusion en cours.")
+        elif text.startswith("/broadcast") and self.broadcaster and self.is_admin(user_id):
+            self.start_broadcast(chat_id, _command_args(text))
+        elif text.startswith("/profile") and self.is_admin(user_id):
+            self.handle_profile(chat_id, text.split()[1:])
+        elif text.startswith("/stats") and self.events is not None and self.is_admin(user_id):
+            self.handle_stats(chat_id)
+        else:
+            self.send_template(chat_id, "unknown")
+
+    def start_broadcast(self, chat_id: int, announcement: str):
+        if not announcement:
+            self.client.send_message(
+                chat_id,
+                "📣 *Diffusion*\n\nUsage : `/broadcast <message>`\n"
+                f"Abonnés : {len(self.subscribers)}",
+            )
+            return
+        # Preview to the admin first: a Markdown error would otherwise fail for every subscriber.
+        preview, error_code, _ = self.client.request(
+            "sendMessage", {"chat_id": chat_id, "text": announcement, "parse_mode": "Markdown"}
+        )
+        if preview is None:
+            self.client.send_message(
+                chat_id,
+                f"❌ Aperçu impossible (erreur {error_code}). Vérifiez la mise en forme Markdown.",
+            )
+            return
+        if self.broadcaster.start(announcement, chat_id):
+            self.client.send_message(
+                chat_id,
+                f"📣 Diffusion lancée vers {len(self.subscribers)} abonnés.\n"
+                "Utilisez `/broadcast_cancel` pour l'arrêter.",
+            )
+        else:
+            self.client.send_message(chat_id, "⏳ Une diffusion est déjà en cours.")
+
+    def handle_profile(self, chat_id: int, args: list):
+        """/profile on [rate] | off | dump | reset"""
+        action = args[0] if args else "status"
+        if action == "on":
+            try:
+                rate = float(args[1]) if len(args) > 1 else None
+            except ValueError:
+                rate = None
+            profiler.configure(True, rate)
+        elif action == "off":
+            profiler.configure(False)
+        elif action == "reset":
+            profiler.reset()
+        elif action == "dump":
+            prefix = os.path.join(self.data_dir or ".", "profile")
+            paths = profiler.dump(prefix)
+            top = "\n".join(f"• `{line}`" for line in profiler.top()) or "_Aucun échantillon_"
+            self.client.send_message(
+                chat_id,
+                f"🔬 *Profil ({profiler.samples} échantillons)*\n\n{top}\n\n"
+                "📁 Fichiers (format flamegraph) :\n" + "\n".join(f"`{path}`" for path in paths),
+            )
+            return
+
+        state = "🟢 activé" if profiler.enabled else "⚪ désactivé"
+        self.client.send_message(
+            chat_id,
+            f"🔬 *Profilage* {state}\n\n"
+            f"Taux d'échantillonnage : {profiler.sample_rate:.0%}\n"
+            f"Échantillons : {profiler.samples}\n\n"
+            "Usage : `/profile on [taux]`, `/profile off`, `/profile dump`, `/profile reset`",
+        )
+
+    def handle_stats(self, chat_id: int):
+        """Usage summary from the hourly rollups: last 24 hours, last 7 days, per day."""
+        day, week = self.events.summary(24), self.events.summary(24 * 7)
+
+        def describe(summary: Dict[str, Any]) -> str:
+            issues = summary["issues"]
+            bugs = {prio: issues[f"bug-{prio}"] for prio in ("urgent", "high", "normal")}
+            median = summary["median_latency"]
+            return (
+                f"• Commandes : {sum(summary['commands'].values())}\n"
+                f"• Feedbacks : {issues['feedback']}\n"
+                f"• Bugs : {sum(bugs.values())} "
+                f"(🚨 {bugs['urgent']} / 🔴 {bugs['high']} / 🟡 {bugs['normal']})\n"
+                f"• Échecs GitHub : {summary['failed']}\n"
+                f"• Délai médian jusqu'à l'issue : {_format_duration(median) if median else '—'}"
+            )
+
+        top = ", ".join(f"`/{command}` {count}" for command, count in week["commands"].most_common(5))
+        per_day = "\n".join(
+            f"`{time.strftime('%d/%m', time.gmtime(entry['day_start']))}` "
+            f"💡 {entry['feedback']}  🐛 {entry['bugs']}"
+            for entry in self.events.daily_issues(7)
+        )
+        self.client.send_message(
+            chat_id,
+            f"📈 *Statistiques NgonNest*\n\n"
+            f"*Dernières 24 h :*\n{describe(day)}\n\n"
+            f"*7 derniers jours :*\n{describe(week)}\n"
+            f"• Commandes les plus utilisées : {top or '—'}\n\n"
+            f"*Par jour (UTC) :*\n{per_day}",
+        )
+
+    def _record_issue(self, user_id: int, report_type: str, issue: Optional[Dict[str, Any]]):
+        started = self.report_started.pop(user_id, None)
+        if self.events is None:
+            return
+        if issue:
+            self.events.record_issue(report_type, time.monotonic() - started if started else None)
+        else:
+            self.events.record_issue_failed(report_type)
+
+    def handle_message(self, message: Dict[str, Any]):
+        chat_id = message["chat"]["id"]
+        user_id = message["from"]["id"]
+        user = message["from"]
+        text = message.get("text", "") or ""
+
+        if user_id not in self.user_states:
+            self.client.send_message(
+                chat_id,
+                "🤔 Je ne comprends pas ce message.\n\n"
+                "Utilisez une commande comme `/feedback` ou `/bug`, "
+                "ou consultez l'aide avec `/help`.",
+            )
+            return
+
+        state = self.user_states[user_id]
+        if state == "feedback":
+            self.process_feedback(chat_id, user, text)
+        elif state == "bug":
+            self.process_bug_report(chat_id, user, text)
+
+        if user_id in self.user_states:
+            del self.user_states[user_id]
+
+    def process_feedback(self, chat_id: int, user: Dict[str, Any], message: str):
+        user_id = user["id"]
+        user_name = user.get("username") or user.get("first_name", f"User_{user_id}")
+
+        title = f"[FEEDBACK] Suggestion de {user_name}"
+        body = (
+            f"📝 **Feedback de l'utilisateur @{user_name}**\n\n"
+            f"**Message :**\n{message}\n\n"
+            f"**Informations :**\n- ID utilisateur: {user_id}"
+        )
+
+        issue = self.github.create_issue(
+            title=title,
+            body=body,
+            labels=list(self.labels["feedback"]),
+        )
+        self._record_issue(user_id, "feedback", issue)
+
+        if issue:
+            self.client.send_message(
+                chat_id,
+                "✅ *Feedback envoyé avec succès !*\n\n"
+                f"📋 **Numéro de suivi :** #{issue['number']}\n"
+                f"🔗 **Lien :** {issue['html_url']}\n\n"
+                "Merci pour votre contribution ! Nous étudierons votre suggestion.",
+            )
+        else:
+            self.client.send_message(
+                chat_id,
+                "❌ *Erreur lors de l'envoi*\n\n"
+                "Votre feedback n'a pas pu être envoyé à cause d'un problème technique.\n\n"
+                "Réessayez plus tard ou contactez l'équipe de support.",
+            )
+
+    def process_bug_report(self, chat_id: int, user: Dict[str, Any], message: str):
+        user_id = user["id"]
+        user_name = user.get("username") or user.get("first_name", f"User_{user_id}")
+
+        priority = "normal"
+        priority_keywords = {
+            "crash": "urgent",
+            "plantage": "urgent",
+            "bloque": "high",
+            "erreur": "high",
+            "ne fonctionne": "high",
+            "bug critique": "urgent",
+        }
+
+        message_lower = message.lower()
+        for keyword, prio in priority_keywords.items():
+            if keyword in message_lower:
+                priority = prio
+                break
+
+        title = f"[BUG-{priority.upper()}] Signalement de {user_name}"
+        priority_emoji = {"urgent": "🚨", "high": "🔴", "normal": "🟡"}
+        title = f"{priority_emoji.get(priority, '🟡')} {title}"
+
+        body = (
+            f"🐛 **Bug signalé par @{user_name}**\n\n"
+            f"**Priorité:** {priority.upper()}\n\n"
+            f"**Description du problème:**\n{message}\n\n"
+            f"**Informations techniques:**\n- ID utilisateur: {user_id}\n\n"
+            f"**Note pour les développeurs:**\n_Priorité détectée automatiquement basée sur les mots-clés dans le message._"
+        )
+
+        labels = list(self.labels["bug"])
+        if priority == "urgent":
+            labels.extend(["urgent", "priority-urgent"])
+        elif priority == "high":
+            labels.extend(["high-priority"])
+
+        issue = self.github.create_issue(title=title, body=body, labels=labels)
+        self._record_issue(user_id, f"bug-{priority}", issue)
+
+        if issue:
+            priority_text = {
+                "urgent": "🔴 **URGENTE** - sera traitée rapidement",
+                "high": "🟠 **ÉLEVÉE** - traitement prioritaire",
+                "normal": "🟡 **NORMALE** - traitement standard",
+            }
+            self.client.send_message(
+                chat_id,
+                "✅ *Bug signalé avec succès !*\n\n"
+                f"📋 **Numéro de suivi :** #{issue['number']}\n"
+                f"🔗 **Lien :** {issue['html_url']}\n"
+                f"🎯 **Priorité détectée :** {priority_text.get(priority, priority)}\n\n"
+                "Nous examinerons le problème et vous tiendrons informé.",
+            )
+        else:
+            self.client.send_message(
+                chat_id,
+                "❌ *Erreur lors du signalement*\n\n"
+                "Votre rapport de bug n'a pas pu être transmis à cause d'un problème technique.\n\n"
+                "Réessayez plus tard ou contactez l'équipe de support.",
+            )
+
+
+def _command_args(text: str) -> str:
+    """Text after the command word ("/bug@NgonNestBot it crashes" -> "it crashes")."""
+    parts = text.split(maxsplit=1)
+    return parts[1].strip() if len(parts) > 1 else ""
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return "< 1 s"
+    if seconds < 60:
+        return f"{seconds:.0f} s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def parse_admin_ids(value: Optional[str]) -> set:
+    """Parse a comma-separated list of Telegram user ids (ADMIN_IDS)."""
+    return {int(part) for part in (value or "").split(",") if part.strip()}
@@ -0,0 +1,167 @@
+"""
+Deduplication of redelivered webhook updates.
+
+Telegram redelivers an update when the webhook is slow or answers with an
+error. An ``update_id`` is claimed as in-flight while it is processed,
+confirmed once it was handled (2xx), and released when handling failed so
+that the redelivery is processed again. Confirmed ids are remembered for a
+time window and their redeliveries are acknowledged without processing. The
+default cache is in-process; serverless instances can share one through Redis
+(``pip install redis`` and set DEDUP_REDIS_URL).
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of UpdateDeduplicator.claim
+CLAIMED = "claimed"
+IN_FLIGHT = "in_flight"
+DUPLICATE = "duplicate"
+
+
+class DedupBackend:
+    """Shared store for update ids. Subclass to plug another backend."""
+
+    def claim(self, key: str, ttl: float) -> str:
+        """Mark ``key`` in-flight for ``ttl`` seconds unless it is already known.
+
+        Return CLAIMED, IN_FLIGHT or DUPLICATE.
+        """
+        raise NotImplementedError
+
+    def confirm(self, key: str, window: float) -> None:
+        """Mark ``key`` as processed for ``window`` seconds."""
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        """Forget an in-flight ``key`` so that a redelivery is processed again."""
+        raise NotImplementedError
+
+
+class RedisDedupBackend(DedupBackend):
+    IN_FLIGHT_VALUE = b"in_flight"
+    DONE_VALUE = b"done"
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("DEDUP_REDIS_URL is set but the 'redis' package is not installed")
+            client = redis.Redis.from_url(url, socket_timeout=1)
+        self.client = client
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"ngonnest:update:{key}"
+
+    def claim(self, key: str, ttl: float) -> str:
+        if self.client.set(self._key(key), self.IN_FLIGHT_VALUE, nx=True, ex=max(1, int(ttl))):
+            return CLAIMED
+        # A key that expired between the two calls counts as in flight: Telegram retries later.
+        return DUPLICATE if self.client.get(self._key(key)) == self.DONE_VALUE else IN_FLIGHT
+
+    def confirm(self, key: str, window: float) -> None:
+        self.client.set(self._key(key), self.DONE_VALUE, ex=max(1, int(window)))
+
+    def release(self, key: str) -> None:
+        self.client.delete(self._key(key))
+
+
+class UpdateDeduplicator:
+    """Bounded, time-windowed record of in-flight and processed update ids."""
+
+    def __init__(self, window: float = 600.0, max_size: int = 10000,
+                 backend: Optional[DedupBackend] = None, namespace: str = "default",
+                 claim_ttl: float = 60.0):
+        self.window = window
+        self.max_size = max_size
+        self.backend = backend
+        self.namespace = namespace
+        # A claim left by a crashed handler expires after this, so the update isn't stuck.
+        self.claim_ttl = claim_ttl
+        self._done: "OrderedDict[int, float]" = OrderedDict()
+        self._in_flight: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, update_id: int) -> str:
+        return f"{self.namespace}:{update_id}"
+
+    def _prune(self, now: float) -> None:
+        """Drop expired entries. Caller holds the lock."""
+        # Entries are kept in insertion order, so expired ones are at the front.
+        while self._done:
+            done_at = next(iter(self._done.values()))
+            if now - done_at < self.window and len(self._done) < self.max_size:
+                break
+            self._done.popitem(last=False)
+        for update_id in [u for u, at in self._in_flight.items() if now - at >= self.claim_ttl]:
+            del self._in_flight[update_id]
+
+    def claim(self, update_id: int) -> str:
+        """Start processing ``update_id``. Return CLAIMED, IN_FLIGHT or DUPLICATE.
+
+        Only a CLAIMED update may be processed; the caller must then ``confirm``
+        or ``release`` it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            if update_id in self._done:
+                return DUPLICATE
+            if update_id in self._in_flight:
+                return IN_FLIGHT
+            self._in_flight[update_id] = now
+        if self.backend:
+            try:
+                outcome = self.backend.claim(self._key(update_id), self.claim_ttl)
+            except Exception as e:
+                # The local cache still covers redeliveries to this instance.
+                logger.warning(f"Dedup backend unavailable: {e}")
+                return CLAIMED
+            if outcome != CLAIMED:
+                with self._lock:
+                    self._in_flight.pop(update_id, None)
+                    if outcome == DUPLICATE:
+                        self._done[update_id] = now
+                return outcome
+        return CLAIMED
+
+    def confirm(self, update_id: int) -> None:
+        """Record a claimed update as processed: its redeliveries are skipped."""
+        with self._lock:
+            self._in_flight.pop(update_id, None)
+            self._done[update_id] = time.monotonic()
+        if self.backend:
+            try:
+                self.backend.confirm(self._key(update_id), self.window)
+            except Exception as e:
+                logger.warning(f"Dedup backend unavailable: {e}")
+
+    def release(self, update_id: int) -> None:
+        """Give up a claimed update after a failure: its redelivery is processed again."""
+        with self._lock:
+            self._in_flight.pop(update_id, None)
+        if self.backend:
+            try:
+                self.backend.release(self._key(update_id))
+            except Exception as e:
+                # The claim expires on its own after claim_ttl.
+                logger.warning(f"Dedup backend unavailable: {e}")
+
+    @classmethod
+    def from_env(cls, namespace: str = "default") -> "UpdateDeduplicator":
+        url = os.getenv("DEDUP_REDIS_URL")
+        return cls(
+            window=float(os.getenv("DEDUP_WINDOW", "600")),
+            backend=RedisDedupBackend(url) if url else None,
+            namespace=namespace,
+        )
@@ -0,0 +1,253 @@
+"""
+Append-only event log with hourly rollups, backing the admin /stats command.
+
+Every handled command and issue creation is appended to ``events.log`` as a
+fixed 12-byte record. Per-hour rollups (counts, priority mix, latency
+histogram) are updated in memory on each write and snapshotted to
+``rollups.json`` with the log offset they cover. Rollups belong to the active
+instance: ``activate`` (when it starts serving, e.g. after a leader takeover)
+loads the snapshot and replays only the log tail after it. Queries read at
+most a week of hourly rollups, however large the log grows.
+"""
+import json
+import logging
+import math
+import os
+import struct
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# timestamp (s), kind, detail, reserved, value (latency in ms)
+RECORD = struct.Struct("<IBBHI")
+
+COMMAND = 1
+ISSUE_CREATED = 2
+ISSUE_FAILED = 3
+
+COMMANDS = ("other", "start", "help", "status", "cancel", "feedback", "bug",
+            "subscribe", "unsubscribe", "broadcast", "broadcast_cancel", "profile", "stats")
+REPORT_TYPES = ("feedback", "bug-normal", "bug-high", "bug-urgent")
+
+# Latency histogram: bucket i covers [1.25**i, 1.25**(i+1)) ms, i.e. ±12% resolution.
+BUCKET_GROWTH = 1.25
+MAX_BUCKET = 100
+
+RETENTION_HOURS = 24 * 90
+SNAPSHOT_EVERY = 50
+
+
+def command_code(command: str) -> int:
+    return COMMANDS.index(command) if command in COMMANDS else 0
+
+
+def report_code(report_type: str) -> int:
+    return REPORT_TYPES.index(report_type)
+
+
+def _bucket(latency_ms: int) -> int:
+    return min(MAX_BUCKET, int(math.log(latency_ms + 1, BUCKET_GROWTH)))
+
+
+def _new_rollup() -> Dict[str, Any]:
+    return {"commands": Counter(), "issues": Counter(), "failed": 0, "latency": Counter()}
+
+
+class EventLog:
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, "events.log")
+        self.snapshot_path = os.path.join(directory, "rollups.json")
+        self._rollups: Dict[int, Dict[str, Any]] = {}
+        self._offset = 0  # bytes of the log already folded into the rollups
+        self._unsaved = 0
+        self._active = False
+        self._lock = threading.Lock()
+
+    # -- writing -----------------------------------------------------------
+
+    def record(self, kind: int, detail: int = 0, value: int = 0, timestamp: Optional[float] = None) -> None:
+        ts = int(timestamp if timestamp is not None else time.time())
+        data = RECORD.pack(ts, kind, detail, 0, min(value, 0xFFFFFFFF))
+        with self._lock:
+            with open(self.log_path, "ab") as f:
+                f.write(data)
+                end = f.tell()
+            if not self._active:
+                # Folded in by the replay when this instance becomes active.
+                return
+            if end == self._offset + RECORD.size:
+                self._apply(ts, kind, detail, value)
+                self._offset = end
+            else:
+                # Another writer appended since our last record: fold its events too.
+                self._replay(end)
+            self._unsaved += 1
+            if self._unsaved >= SNAPSHOT_EVERY:
+                self._save_snapshot()
+
+    def record_command(self, command: str) -> None:
+        self.record(COMMAND, command_code(command))
+
+    def record_issue(self, report_type: str, latency_seconds: Optional[float]) -> None:
+        latency_ms = int(latency_seconds * 1000) if latency_seconds is not None else 0
+        self.record(ISSUE_CREATED, report_code(report_type), latency_ms)
+
+    def record_issue_failed(self, report_type: str) -> None:
+        self.record(ISSUE_FAILED, report_code(report_type))
+
+    def _apply(self, ts: int, kind: int, detail: int, value: int) -> None:
+        """Fold one event into its hourly rollup. Caller holds the lock."""
+        hour = ts // 3600
+        rollup = self._rollups.get(hour)
+        if rollup is None:
+            rollup = self._rollups[hour] = _new_rollup()
+            self._prune(hour)
+        if kind == COMMAND:
+            rollup["commands"][COMMANDS[detail] if detail < len(COMMANDS) else "other"] += 1
+        elif kind == ISSUE_CREATED:
+            rollup["issues"][REPORT_TYPES[detail]] += 1
+            if value:
+                rollup["latency"][_bucket(value)] += 1
+        elif kind == ISSUE_FAILED:
+            rollup["failed"] += 1
+
+    def _prune(self, current_hour: int) -> None:
+        for hour in [h for h in self._rollups if h <= current_hour - RETENTION_HOURS]:
+            del self._rollups[hour]
+
+    # -- persistence -------------------------------------------------------
+
+    def _save_snapshot(self) -> None:
+        snapshot = {
+            "offset": self._offset,
+            "rollups": {
+                str(hour): {
+                    "commands": dict(r["commands"]),
+                    "issues": dict(r["issues"]),
+                    "failed": r["failed"],
+                    "latency": {str(b): n for b, n in r["latency"].items()},
+                }
+                for hour, r in self._rollups.items()
+            },
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._unsaved = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._active and self._unsaved:
+                self._save_snapshot()
+
+    def activate(self) -> None:
+        """Load the rollups as of now: snapshot, then the log tail written after it."""
+        with self._lock:
+            self._rollups, self._offset = {}, 0
+            self._load()
+            self._active = True
+
+    def deactivate(self) -> None:
+        """Save the rollups and stop folding events in, e.g. after losing leadership."""
+        with self._lock:
+            if self._active and self._unsaved:
+                self._save_snapshot()
+            self._active = False
+            self._rollups, self._offset = {}, 0
+
+    def _replay(self, end: int) -> int:
+        """Fold the records between the current offset and ``end``. Caller holds the lock."""
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read(end - self._offset)
+        tail = tail[:len(tail) - len(tail) % RECORD.size]
+        for ts, kind, detail, _, value in RECORD.iter_unpack(tail):
+            self._apply(ts, kind, detail, value)
+        self._offset += len(tail)
+        return len(tail) // RECORD.size
+
+    def _load(self) -> None:
+        """Caller holds the lock."""
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                self._offset = snapshot["offset"]
+                for hour, r in snapshot["rollups"].items():
+                    self._rollups[int(hour)] = {
+                        "commands": Counter(r["commands"]),
+                        "issues": Counter(r["issues"]),
+                        "failed": r["failed"],
+                        "latency": Counter({int(b): n for b, n in r["latency"].items()}),
+                    }
+            except (ValueError, KeyError) as e:
+                logger.error(f"Invalid rollup snapshot, rebuilding from the event log: {e}")
+                self._rollups, self._offset = {}, 0
+
+        if not os.path.exists(self.log_path):
+            return
+        size = os.path.getsize(self.log_path)
+        usable = size - size % RECORD.size
+        if self._offset > usable:
+            logger.warning("Rollup snapshot is ahead of the event log, rebuilding")
+            self._rollups, self._offset = {}, 0
+        if self._offset < usable:
+            replayed = self._replay(usable)
+            logger.info(f"Replayed {replayed} events into the rollups")
+            self._save_snapshot()
+
+    # -- queries -----------------------------------------------------------
+
+    def summary(self, hours: int, now: Optional[float] = None) -> Dict[str, Any]:
+        """Aggregate the last ``hours`` hourly rollups (``hours`` is capped by retention)."""
+        current_hour = int(now if now is not None else time.time()) // 3600
+        commands, issues, latency = Counter(), Counter(), Counter()
+        failed = 0
+        with self._lock:
+            for hour in range(current_hour - hours + 1, current_hour + 1):
+                rollup = self._rollups.get(hour)
+                if rollup is None:
+                    continue
+                commands.update(rollup["commands"])
+                issues.update(rollup["issues"])
+                latency.update(rollup["latency"])
+                failed += rollup["failed"]
+        return {"commands": commands, "issues": issues, "failed": failed,
+                "median_latency": _median_seconds(latency)}
+
+    def daily_issues(self, days: int, now: Optional[float] = None) -> List[Dict[str, int]]:
+        """Feedback / bug counts per day (oldest first), for the last ``days`` days."""
+        current_hour = int(now if now is not None else time.time()) // 3600
+        first_hour = (current_hour // 24 - days + 1) * 24
+        result = []
+        with self._lock:
+            for day in range(days):
+                counts = Counter()
+                for hour in range(first_hour + day * 24, first_hour + (day + 1) * 24):
+                    rollup = self._rollups.get(hour)
+                    if rollup:
+                        counts.update(rollup["issues"])
+                result.append({
+                    "day_start": (first_hour + day * 24) * 3600,
+                    "feedback": counts["feedback"],
+                    "bugs": sum(n for t, n in counts.items() if t.startswith("bug")),
+                })
+        return result
+
+
+def _median_seconds(histogram: Counter) -> Optional[float]:
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen * 2 >= total:
+            # Geometric middle of the bucket.
+            return BUCKET_GROWTH ** (bucket + 0.5) / 1000
+    return None
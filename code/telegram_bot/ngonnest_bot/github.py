@@ -0,0 +1,56 @@
+"""
+GitHub issue creation for /feedback and /bug reports.
+"""
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import requests
+
+from . import codec
+from .profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubIssueManager:
+    def __init__(self, github_token: Optional[str] = None, github_repo: Optional[str] = None,
+                 session: Optional[requests.Session] = None, use_env: bool = True):
+        # use_env=False: no fallback to GITHUB_TOKEN / GITHUB_REPO (multi-bot hosts,
+        # where those belong to another bot).
+        self.github_token = github_token or (os.getenv("GITHUB_TOKEN") if use_env else None)
+        self.github_repo = github_repo or (os.getenv("GITHUB_REPO", "Ken-Andre/ngonnest") if use_env else None)
+        self.base_url = "https://api.github.com"
+        self.session = session or requests.Session()
+
+        if not self.github_token:
+            logger.warning("GITHUB_TOKEN not set - GitHub integration will be disabled")
+
+    def create_issue(self, title: str, body: str, labels: list[str] = None) -> Optional[Dict[str, Any]]:
+        """Create a GitHub issue"""
+        if not self.github_token:
+            logger.error("GitHub token not available")
+            return None
+
+        headers = {
+            "Authorization": f"token {self.github_token}",
+            "Accept": "application/vnd.github.v3+json",
+            **codec.JSON_HEADERS,
+        }
+
+        data = {
+            "title": title,
+            "body": body,
+            "labels": labels or ["bug"]
+        }
+
+        url = f"{self.base_url}/repos/{self.github_repo}/issues"
+
+        try:
+            with profiler.stage("github"):
+                response = self.session.post(url, headers=headers, data=codec.dumps(data), timeout=30)
+                response.raise_for_status()
+                return codec.loads(response.content)
+        except Exception as e:
+            logger.error(f"Failed to create GitHub issue: {e}")
+            return None
@@ -0,0 +1,163 @@
+"""
+Lease-based leader election for the polling bot.
+
+Only one replica may call getUpdates at a time, otherwise Telegram answers
+409 Conflict. Replicas compete for a time-limited lease stored in a backend;
+the holder renews it from a heartbeat thread, so a slow iteration of the
+polling loop (long poll plus GitHub and sendMessage calls) cannot let it
+expire. Standbys check back periodically and take over once the lease
+expires (at most ``ttl + retry_interval`` after the leader dies).
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Optional, Dict, Any
+
+from . import filelock
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseBackend:
+    """Storage for a single lease record. Subclass to plug another backend."""
+
+    def try_acquire(self, holder_id: str, ttl: float) -> bool:
+        """Take or renew the lease for ``holder_id``. Return True on success."""
+        raise NotImplementedError
+
+    def release(self, holder_id: str) -> None:
+        """Drop the lease if ``holder_id`` still holds it."""
+        raise NotImplementedError
+
+
+class FileLeaseBackend(LeaseBackend):
+    """Lease stored as JSON in a file, updated under an exclusive file lock.
+
+    Works for replicas sharing a filesystem (same host, shared volume).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self, fd: int) -> Dict[str, Any]:
+        os.lseek(fd, 0, os.SEEK_SET)
+        raw = b""
+        while True:
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                break
+            raw += chunk
+        try:
+            return json.loads(raw) if raw.strip() else {}
+        except ValueError:
+            logger.warning(f"Corrupted lease file {self.path}, resetting it")
+            return {}
+
+    def _write(self, fd: int, record: Dict[str, Any]) -> None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps(record).encode("utf-8"))
+        os.fsync(fd)
+
+    def try_acquire(self, holder_id: str, ttl: float) -> bool:
+        fd = filelock.lock(self.path)
+        try:
+            record = self._read(fd)
+            now = time.time()
+            holder = record.get("holder")
+            if holder and holder != holder_id and record.get("expires_at", 0) > now:
+                return False
+            self._write(fd, {"holder": holder_id, "expires_at": now + ttl})
+            return True
+        finally:
+            filelock.unlock(fd)
+
+    def release(self, holder_id: str) -> None:
+        fd = filelock.lock(self.path)
+        try:
+            if self._read(fd).get("holder") == holder_id:
+                self._write(fd, {})
+        finally:
+            filelock.unlock(fd)
+
+
+class LeaderElector:
+    """Keeps track of whether this process currently holds the lease."""
+
+    def __init__(self, backend: LeaseBackend, ttl: float = 30.0,
+                 holder_id: Optional[str] = None):
+        self.backend = backend
+        self.ttl = ttl
+        self.retry_interval = ttl / 3
+        self.holder_id = holder_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._is_leader = False
+        self._renewed_at = 0.0
+        self._lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._heartbeat_stop = threading.Event()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._is_leader
+
+    def ensure_leadership(self) -> bool:
+        """Acquire or renew the lease when due. Cheap to call on every loop."""
+        with self._lock:
+            now = time.monotonic()
+            if self._is_leader and now - self._renewed_at < self.retry_interval:
+                return True
+            try:
+                acquired = self.backend.try_acquire(self.holder_id, self.ttl)
+            except OSError as e:
+                logger.error(f"Lease backend error: {e}")
+                acquired = False
+            if acquired != self._is_leader:
+                if acquired:
+                    logger.info(f"👑 Leadership acquired by {self.holder_id}")
+                else:
+                    logger.warning(f"Leadership lost by {self.holder_id}, switching to standby")
+            self._is_leader = acquired
+            if acquired:
+                self._renewed_at = now
+            return acquired
+
+    def _heartbeat_loop(self) -> None:
+        while not self._heartbeat_stop.wait(self.retry_interval / 2):
+            if self._is_leader:
+                # Renews when due; flips is_leader if the lease was lost meanwhile.
+                self.ensure_leadership()
+
+    def start_heartbeat(self) -> None:
+        """Keep renewing the lease in the background while this process leads."""
+        with self._lock:
+            if self._heartbeat and self._heartbeat.is_alive():
+                return
+            self._heartbeat_stop.clear()
+            self._heartbeat = threading.Thread(target=self._heartbeat_loop,
+                                               name="lease-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def release(self) -> None:
+        self._heartbeat_stop.set()
+        with self._lock:
+            if not self._is_leader:
+                return
+            self._is_leader = False
+            try:
+                self.backend.release(self.holder_id)
+                logger.info(f"Leadership released by {self.holder_id}")
+            except OSError as e:
+                logger.error(f"Failed to release lease: {e}")
+
+
+def elector_from_env() -> Optional[LeaderElector]:
+    """Build an elector from LEADER_LEASE_FILE / LEADER_LEASE_TTL, if configured."""
+    path = os.getenv("LEADER_LEASE_FILE")
+    if not path:
+        return None
+    ttl = float(os.getenv("LEADER_LEASE_TTL", "30"))
+    return LeaderElector(FileLeaseBackend(path), ttl=ttl)
@@ -0,0 +1,92 @@
+"""
+Long-polling transport: fetches updates with getUpdates and feeds the core.
+"""
+import logging
+import threading
+from typing import Optional
+
+from .core import BotCore
+from .leader import LeaderElector
+from .profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+
+class PollingTransport:
+    """getUpdates loop for one bot, optionally gated by leader election."""
+
+    CONFLICT_BACKOFF = 5
+    POLL_TIMEOUT = 10
+
+    def __init__(self, core: BotCore, elector: Optional[LeaderElector] = None):
+        self.core = core
+        self.client = core.client
+        self.name = core.name
+        self.elector = elector
+        self.last_update_id = 0
+        self.last_error_code: Optional[int] = None
+        self._stop = threading.Event()
+        self._active = False
+
+    def process_updates(self):
+        with profiler.sample("poll"):
+            updates, self.last_error_code, _ = self.client.request(
+                "getUpdates",
+                {"offset": self.last_update_id + 1, "timeout": self.POLL_TIMEOUT},
+                timeout=self.POLL_TIMEOUT + 30,
+            )
+        if not updates:
+            return
+        for update in updates:
+            update_id = update.get("update_id")
+            if update_id:
+                self.last_update_id = max(self.last_update_id, update_id)
+            try:
+                with profiler.sample("update"):
+                    self.core.handle_update(update)
+            except Exception as e:
+                # One bad update must not block the rest of the batch.
+                logger.error(f"[{self.name}] Error handling update {update_id}: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        logger.info(f"🚀 Telegram Bot [{self.name}] started! Press Ctrl+C to stop.")
+        if self.elector:
+            logger.info(f"🗳️ Leader election enabled (holder {self.elector.holder_id})")
+            self.elector.start_heartbeat()
+        else:
+            logger.info("📡 Bot is polling for messages...")
+        try:
+            while not self._stop.is_set():
+                try:
+                    if self.elector and not self.elector.ensure_leadership():
+                        if self._active:
+                            # Demoted: the new leader owns broadcasts and retries now.
+                            self._active = False
+                            self.core.stop_background_jobs()
+                        # Standby: stay idle until the leader's lease expires.
+                        self._stop.wait(self.elector.retry_interval)
+                        continue
+                    if not self._active:
+                        # Only the polling instance may resume jobs such as broadcasts.
+                        self._active = True
+                        self.core.resume_background_jobs()
+                    self.process_updates()
+                    if self.last_error_code == 409:
+                        # Another instance is polling: back off instead of spinning.
+                        logger.warning(f"[{self.name}] getUpdates conflict, retrying in {self.CONFLICT_BACKOFF}s")
+                        self._stop.wait(self.CONFLICT_BACKOFF)
+                except KeyboardInterrupt:
+                    logger.info("👋 Bot stopped by user.")
+                    break
+                except Exception as e:
+                    if "timed out" not in str(e).lower():
+                        logger.error(f"Error: {e}")
+        finally:
+            if self._active:
+                self._active = False
+                self.core.stop_background_jobs()
+            if self.elector:
+                self.elector.release()
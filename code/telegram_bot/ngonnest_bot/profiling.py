@@ -0,0 +1,161 @@
+"""
+Sampling profiler for the update pipeline.
+
+When enabled, a fraction of updates (and polls) is sampled. Each pipeline
+stage (fetch, decode, route, handler, github, send) records wall-clock and CPU
+self-time under its stack path. ``dump`` writes the totals in collapsed-stack
+format ("poll;fetch 1234"), which flamegraph.pl, speedscope or inferno read
+directly. Calls handed to the outbound scheduler carry the sampled path to
+the worker thread ("update;handler;outbound;send").
+
+Toggle with BOT_PROFILE=1 / BOT_PROFILE_SAMPLE_RATE, or with the admin
+``/profile`` command. When disabled, or for an unsampled update, each stage
+costs one attribute check.
+"""
+import os
+import random
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+
+class _NullContext:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullContext()
+
+
+class _Frame:
+    __slots__ = ("profiler", "name", "parent_path", "wall_start", "cpu_start", "child_wall", "child_cpu")
+
+    def __init__(self, profiler: "Profiler", name: str, parent_path: Optional[str] = None):
+        self.profiler = profiler
+        self.name = name
+        self.parent_path = parent_path
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+
+    def __enter__(self):
+        self.profiler._local.stack.append(self)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.thread_time() - self.cpu_start
+        stack = self.profiler._local.stack
+        path = ";".join(frame.name for frame in stack)
+        if stack[0].parent_path:
+            path = f"{stack[0].parent_path};{path}"
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+        root = not stack and self.parent_path is None
+        self.profiler._record(path, wall - self.child_wall, cpu - self.child_cpu, root=root)
+        return False
+
+
+class Profiler:
+    """Process-wide stage profiler with per-thread stacks."""
+
+    def __init__(self, enabled: bool = False, sample_rate: float = 0.1):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self.samples = 0
+
+    def configure_from_env(self) -> None:
+        """Apply BOT_PROFILE / BOT_PROFILE_SAMPLE_RATE (call after loading .env)."""
+        self.configure(
+            enabled=os.getenv("BOT_PROFILE", "0").lower() in ("1", "true", "yes", "on"),
+            sample_rate=float(os.getenv("BOT_PROFILE_SAMPLE_RATE", str(self.sample_rate))),
+        )
+
+    def sample(self, root: str):
+        """Open a root stage if profiling is on and this unit of work is sampled."""
+        if not self.enabled or getattr(self._local, "stack", None) or random.random() >= self.sample_rate:
+            return _NULL
+        self._local.stack = []
+        return _Frame(self, root)
+
+    def stage(self, name: str):
+        """Time a pipeline stage nested in the currently sampled unit of work, if any."""
+        if not getattr(self._local, "stack", None):
+            return _NULL
+        return _Frame(self, name)
+
+    def context(self) -> Optional[str]:
+        """Stack path of the sampled unit of work on this thread, to hand to another thread."""
+        stack = getattr(self._local, "stack", None)
+        return ";".join(frame.name for frame in stack) if stack else None
+
+    def carried(self, context: Optional[str], name: str):
+        """Time ``name`` on this thread as a child of a ``context()`` taken on another thread."""
+        if context is None or getattr(self._local, "stack", None):
+            return _NULL
+        self._local.stack = []
+        return _Frame(self, name, parent_path=context)
+
+    def _record(self, path: str, self_wall: float, self_cpu: float, root: bool) -> None:
+        with self._lock:
+            # Microseconds: collapsed-stack tools expect integer counts.
+            self.wall[path] += int(self_wall * 1e6)
+            self.cpu[path] += int(self_cpu * 1e6)
+            if root:
+                self.samples += 1
+
+    def configure(self, enabled: bool, sample_rate: Optional[float] = None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        with self._lock:
+            self.wall.clear()
+            self.cpu.clear()
+            self.samples = 0
+
+    def collapsed(self, kind: str = "wall") -> List[str]:
+        """Collapsed-stack lines ("a;b;c <microseconds>") for ``kind`` "wall" or "cpu"."""
+        with self._lock:
+            counter = self.wall if kind == "wall" else self.cpu
+            return [f"{path} {value}" for path, value in sorted(counter.items()) if value > 0]
+
+    def dump(self, prefix: str) -> List[str]:
+        """Write ``<prefix>.wall.folded`` and ``<prefix>.cpu.folded``. Returns the paths."""
+        directory = os.path.dirname(prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        paths = []
+        for kind in ("wall", "cpu"):
+            path = f"{prefix}.{kind}.folded"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.collapsed(kind)) + "\n")
+            paths.append(path)
+        return paths
+
+    def top(self, limit: int = 8) -> List[str]:
+        """Human-readable summary of the stacks with the most wall time."""
+        with self._lock:
+            total = sum(self.wall.values()) or 1
+            return [
+                f"{path}: {wall / 1000:.1f} ms wall ({wall * 100 / total:.0f}%), "
+                f"{self.cpu[path] / 1000:.1f} ms CPU"
+                for path, wall in self.wall.most_common(limit)
+            ]
+
+
+profiler = Profiler()
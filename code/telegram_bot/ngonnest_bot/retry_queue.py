@@ -0,0 +1,203 @@
+"""
+Persistent retry queue for outgoing Telegram calls.
+
+When a send fails for a transient reason (network error, 429, 5xx) the call is
+queued here instead of being dropped. A background thread retries it with
+exponential backoff (or Telegram's ``retry_after``), separately from update
+handling. The queue is bounded and saved to disk, so pending replies survive a
+restart or a failover to another instance.
+
+Only the active instance owns the outbox: ``start`` takes an exclusive lock on
+it and reloads it from disk, ``stop`` hands it back. Delivery is
+at-least-once: the same content is not queued twice, but a call whose answer
+was lost (e.g. a read timeout) can reach the user twice.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import codec, filelock
+
+logger = logging.getLogger(__name__)
+
+
+def is_retryable(error_code: Optional[int]) -> bool:
+    """Network errors (no code), rate limiting and server errors are worth retrying."""
+    return error_code is None or error_code == 429 or error_code >= 500
+
+
+class RetryQueue:
+    LOCK_POLL_INTERVAL = 1.0
+
+    def __init__(self, request: Callable[[str, Dict[str, Any]], Tuple[Any, Optional[int], Optional[float]]],
+                 path: str, max_size: int = 1000, base_delay: float = 2.0,
+                 max_delay: float = 300.0, max_attempts: int = 12, name: str = "default"):
+        self.request = request
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.max_size = max_size
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.name = name
+        self._entries: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._worker_alive = False
+        self._lock_fd: Optional[int] = None  # held while this instance owns the outbox
+
+    def _load(self) -> None:
+        """Merge the outbox on disk with calls queued before activation.
+
+        Caller holds the lock and the outbox file lock.
+        """
+        on_disk: List[Dict[str, Any]] = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    on_disk = json.load(f)
+            except ValueError:
+                logger.error(f"[{self.name}] Corrupted retry queue {self.path}, starting empty")
+        keys = {entry["key"] for entry in on_disk}
+        queued_here = [entry for entry in self._entries if entry["key"] not in keys]
+        self._entries = (on_disk + queued_here)[-self.max_size:]
+        if queued_here:
+            self._save()
+        if on_disk:
+            logger.info(f"[{self.name}] {len(on_disk)} pending outgoing calls loaded")
+
+    def _save(self) -> None:
+        """Persist the queue if this instance owns the outbox. Caller holds the lock."""
+        if self._lock_fd is None:
+            # Not active: the outbox belongs to another instance. Kept in memory
+            # and merged into the outbox on activation.
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _delay(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** attempts)
+        return delay * random.uniform(0.5, 1.0)
+
+    def enqueue(self, method: str, data: Dict[str, Any], key: Optional[str] = None,
+                retry_after: Optional[float] = None) -> bool:
+        """Queue a failed call. Returns False if an entry with the same key is already queued.
+
+        The default key is a hash of the call, so identical content is only
+        queued once. ``retry_after`` (from a 429 answer) delays the first retry
+        at least that long.
+        """
+        key = key or hashlib.sha1(method.encode("utf-8") + codec.dumps(data)).hexdigest()
+        with self._cond:
+            if any(entry["key"] == key for entry in self._entries):
+                return False
+            if len(self._entries) >= self.max_size:
+                dropped = self._entries.pop(0)
+                logger.error(f"[{self.name}] Retry queue full, dropping {dropped['method']} {dropped['key']}")
+            self._entries.append({
+                "key": key, "method": method, "data": data,
+                "attempts": 0, "next_at": time.time() + max(self._delay(0), retry_after or 0),
+            })
+            self._save()
+            self._cond.notify()
+        logger.warning(f"[{self.name}] {method} failed, queued for retry ({len(self._entries)} pending)")
+        return True
+
+    def _next_due(self) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Return the earliest entry if due, else the time to wait. Caller holds the lock."""
+        if not self._entries:
+            return None, None
+        entry = min(self._entries, key=lambda e: e["next_at"])
+        wait = entry["next_at"] - time.time()
+        return (entry, None) if wait <= 0 else (None, wait)
+
+    def _activate(self) -> bool:
+        """Wait for the outbox lock, then reload the outbox. False if stopped meanwhile."""
+        waiting_logged = False
+        while True:
+            fd = filelock.lock(self.lock_path, blocking=False)
+            with self._cond:
+                if not self._running:
+                    if fd is not None:
+                        filelock.unlock(fd)
+                    self._worker_alive = False
+                    return False
+                if fd is not None:
+                    self._lock_fd = fd
+                    self._load()
+                    return True
+                if not waiting_logged:
+                    logger.info(f"[{self.name}] Outbox locked by another instance, waiting")
+                    waiting_logged = True
+                self._cond.wait(self.LOCK_POLL_INTERVAL)
+
+    def _deactivate(self) -> None:
+        """Hand the outbox back. Caller holds the lock."""
+        # Everything is on disk for whichever instance becomes active next.
+        self._entries = []
+        if self._lock_fd is not None:
+            filelock.unlock(self._lock_fd)
+            self._lock_fd = None
+        self._worker_alive = False
+
+    def _worker(self) -> None:
+        if not self._activate():
+            return
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        self._deactivate()
+                        return
+                    entry, wait = self._next_due()
+                    if entry:
+                        break
+                    self._cond.wait(timeout=wait)
+
+            result, error_code, retry_after = self.request(entry["method"], entry["data"])
+
+            with self._cond:
+                if entry not in self._entries:
+                    # Dropped while in flight because the queue overflowed.
+                    continue
+                if result is not None:
+                    logger.info(f"[{self.name}] Delivered {entry['method']} after {entry['attempts'] + 1} retries")
+                    self._entries.remove(entry)
+                elif not is_retryable(error_code) or entry["attempts"] + 1 >= self.max_attempts:
+                    logger.error(f"[{self.name}] Giving up on {entry['method']} {entry['key']} (error {error_code})")
+                    self._entries.remove(entry)
+                else:
+                    entry["attempts"] += 1
+                    entry["next_at"] = time.time() + max(self._delay(entry["attempts"]), retry_after or 0)
+                self._save()
+
+    def start(self) -> None:
+        """Become the owner of the outbox (reloading it) and start retrying."""
+        with self._cond:
+            self._running = True
+            if self._worker_alive:
+                # Stopped but the worker hasn't exited yet: it simply carries on.
+                self._cond.notify_all()
+                return
+            self._worker_alive = True
+        self._thread = threading.Thread(target=self._worker, name=f"retry-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop retrying and release the outbox (after the call in flight, if any)."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
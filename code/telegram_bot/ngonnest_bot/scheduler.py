@@ -0,0 +1,123 @@
+"""
+Shared outbound scheduler for Telegram API calls.
+
+Every bot hosted in the process submits its outgoing calls here. Calls are
+queued per bot and picked in round-robin order, so a bot with a large backlog
+cannot starve the others, and each bot is held to Telegram's per-token rate
+limit.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second. Callers serialize access."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+
+    def try_take(self, now: float) -> bool:
+        self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def wait_time(self) -> float:
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class OutboundScheduler:
+    """Round-robin, rate-limited dispatch of outgoing calls across bots."""
+
+    def __init__(self, workers: int = 4, rate_per_bot: float = 30.0):
+        self.workers = workers
+        self.rate_per_bot = rate_per_bot
+        self._queues: Dict[str, Deque[Tuple[Future, Callable, tuple, dict]]] = {}
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._order: List[str] = []
+        self._cursor = 0
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    def register(self, bot_name: str) -> None:
+        with self._cond:
+            if bot_name not in self._queues:
+                self._queues[bot_name] = deque()
+                self._limiters[bot_name] = TokenBucket(self.rate_per_bot)
+                self._order.append(bot_name)
+
+    def submit(self, bot_name: str, fn: Callable, *args, **kwargs) -> Future:
+        """Queue ``fn(*args, **kwargs)`` on behalf of ``bot_name``."""
+        future: Future = Future()
+        with self._cond:
+            if bot_name not in self._queues:
+                raise KeyError(f"Unknown bot '{bot_name}'")
+            self._queues[bot_name].append((future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def _next_job(self):
+        """Pick the next runnable job in round-robin order. Caller holds the lock."""
+        now = time.monotonic()
+        wait = None
+        for i in range(len(self._order)):
+            index = (self._cursor + i) % len(self._order)
+            name = self._order[index]
+            queue = self._queues[name]
+            if not queue:
+                continue
+            limiter = self._limiters[name]
+            if limiter.try_take(now):
+                self._cursor = (index + 1) % len(self._order)
+                return queue.popleft(), None
+            bot_wait = limiter.wait_time()
+            wait = bot_wait if wait is None else min(wait, bot_wait)
+        return None, wait
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if not self._running:
+                        return
+                    job, wait = self._next_job()
+                    if job:
+                        break
+                    self._cond.wait(timeout=wait)
+            future, fn, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                logger.error(f"Outbound call failed: {e}")
+                future.set_exception(e)
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"outbound-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads.clear()
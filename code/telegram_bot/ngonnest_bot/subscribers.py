@@ -0,0 +1,176 @@
+"""
+Compact on-disk set of chat ids subscribed to announcements.
+
+The file is a flat array of little-endian int64 chat ids (8 bytes each).
+Subscribing appends a record. Unsubscribing zeroes the record in place, so
+record offsets stay stable while a broadcast is streaming the file.
+``compact`` drops the zeroed records once no broadcast needs the offsets.
+
+Instances sharing the file (a leader and its standbys) write under an
+exclusive file lock and catch up with each other's changes before writing;
+``reload`` rebuilds the in-memory index when a standby takes over.
+"""
+import logging
+import os
+import struct
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from . import filelock
+
+logger = logging.getLogger(__name__)
+
+RECORD = struct.Struct("<q")
+
+
+class SubscriberStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._index: Dict[int, int] = {}  # chat id -> record number
+        self._records = 0
+        self._inode: Optional[int] = None  # identifies the file the index was built from
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.reload()
+
+    def reload(self) -> None:
+        """Rebuild the index from disk, e.g. when this instance becomes active."""
+        with self._lock:
+            fd = filelock.lock(self.lock_path)
+            try:
+                self._load()
+            finally:
+                filelock.unlock(fd)
+
+    def _load(self) -> None:
+        """Caller holds the lock and the file lock."""
+        self._index = {}
+        self._records = 0
+        self._inode = None
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+            self._inode = os.fstat(f.fileno()).st_ino
+        usable = len(data) - len(data) % RECORD.size
+        if usable != len(data):
+            logger.warning(f"Truncating partial record at the end of {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(usable)
+        for number, (chat_id,) in enumerate(RECORD.iter_unpack(data[:usable])):
+            if chat_id:
+                self._index[chat_id] = number
+        self._records = usable // RECORD.size
+
+    def _sync(self) -> None:
+        """Catch up with writes made by other instances. Caller holds the lock and the file lock."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._records:
+                self._load()
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._records * RECORD.size:
+            # Compacted (or replaced) by another instance: record numbers changed.
+            self._load()
+            return
+        if stat.st_size > self._records * RECORD.size:
+            # Appended by another instance: index the new records.
+            with open(self.path, "rb") as f:
+                f.seek(self._records * RECORD.size)
+                data = f.read()
+            usable = len(data) - len(data) % RECORD.size
+            for number, (chat_id,) in enumerate(RECORD.iter_unpack(data[:usable]), self._records):
+                if chat_id:
+                    self._index[chat_id] = number
+            self._records += usable // RECORD.size
+
+    def _read_record(self, f, number: int) -> int:
+        f.seek(number * RECORD.size)
+        return RECORD.unpack(f.read(RECORD.size))[0]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._index
+
+    def add(self, chat_id: int) -> bool:
+        """Subscribe ``chat_id``. Return False if it was already subscribed."""
+        with self._lock:
+            fd = filelock.lock(self.lock_path)
+            try:
+                self._sync()
+                with open(self.path, "a+b") as f:
+                    number = self._index.get(chat_id)
+                    if number is not None and self._read_record(f, number) == chat_id:
+                        return False
+                    # Appends go to the end whatever the position.
+                    f.write(RECORD.pack(chat_id))
+                    self._inode = os.fstat(f.fileno()).st_ino
+                self._index[chat_id] = self._records
+                self._records += 1
+                return True
+            finally:
+                filelock.unlock(fd)
+
+    def remove(self, chat_id: int) -> bool:
+        """Unsubscribe ``chat_id``. Return False if it wasn't subscribed."""
+        return self.remove_many([chat_id]) == 1
+
+    def remove_many(self, chat_ids: Iterable[int]) -> int:
+        with self._lock:
+            fd = filelock.lock(self.lock_path)
+            try:
+                self._sync()
+                numbers = [self._index.pop(chat_id) for chat_id in set(chat_ids) if chat_id in self._index]
+                removed = 0
+                if numbers:
+                    with open(self.path, "r+b") as f:
+                        for number in numbers:
+                            if not self._read_record(f, number):
+                                # Already unsubscribed by another instance.
+                                continue
+                            f.seek(number * RECORD.size)
+                            f.write(RECORD.pack(0))
+                            removed += 1
+                return removed
+            finally:
+                filelock.unlock(fd)
+
+    def iter_chunks(self, start: int = 0, chunk_size: int = 100) -> Iterator[Tuple[int, List[int]]]:
+        """Yield ``(next_offset, chat_ids)`` chunks read from disk from record ``start``."""
+        if not os.path.exists(self.path):
+            return
+        offset = start
+        with open(self.path, "rb") as f:
+            f.seek(offset * RECORD.size)
+            while True:
+                data = f.read(chunk_size * RECORD.size)
+                usable = len(data) - len(data) % RECORD.size
+                if not usable:
+                    return
+                offset += usable // RECORD.size
+                chat_ids = [chat_id for (chat_id,) in RECORD.iter_unpack(data[:usable]) if chat_id]
+                yield offset, chat_ids
+
+    def compact(self) -> None:
+        """Rewrite the file without unsubscribed records."""
+        with self._lock:
+            fd = filelock.lock(self.lock_path)
+            try:
+                # Start from the file, not the index, so nobody else's subscribers are lost.
+                self._load()
+                chat_ids = sorted(self._index, key=self._index.get)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(b"".join(RECORD.pack(chat_id) for chat_id in chat_ids))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                self._load()
+            finally:
+                filelock.unlock(fd)
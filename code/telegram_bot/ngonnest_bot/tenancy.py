@@ -0,0 +1,114 @@
+"""
+Multi-bot host: runs several branded bots in one process.
+
+Bots are described in a JSON file (see ``bots.example.json``). They share one
+HTTP connection pool and one outbound scheduler; each bot keeps its own token,
+GitHub repository, labels, templates and conversation state. Nothing is
+inherited from the single-bot environment (GITHUB_TOKEN, GITHUB_REPO,
+ADMIN_IDS): a bot missing its own settings must not file reports into, or
+take admins from, another bot's configuration.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .client import TelegramClient
+from .core import BotCore
+from .github import GitHubIssueManager
+from .leader import LeaderElector
+from .polling import PollingTransport
+from .scheduler import OutboundScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def _secret(entry: Dict[str, Any], key: str) -> Optional[str]:
+    """Read ``key`` from the entry, or from the env var named by ``key_env``."""
+    if entry.get(key):
+        return entry[key]
+    env_name = entry.get(f"{key}_env")
+    return os.getenv(env_name) if env_name else None
+
+
+class BotHost:
+    """Owns the shared resources and one polling thread per bot."""
+
+    def __init__(self, bots: List[PollingTransport], scheduler: OutboundScheduler,
+                 elector: Optional[LeaderElector] = None):
+        self.bots = bots
+        self.scheduler = scheduler
+        self.elector = elector
+        self._threads: List[threading.Thread] = []
+
+    @classmethod
+    def from_config(cls, path: str, elector: Optional[LeaderElector] = None) -> "BotHost":
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+        entries = config.get("bots", [])
+        if not entries:
+            raise ValueError(f"No bots defined in {path}")
+
+        workers = config.get("outbound_workers", 4)
+        data_dir = config.get("data_dir", "data")
+        session = requests.Session()
+        # One pool for all bots: pollers plus outbound workers may be busy at once.
+        adapter = HTTPAdapter(pool_maxsize=len(entries) + workers)
+        session.mount("https://", adapter)
+        scheduler = OutboundScheduler(workers=workers, rate_per_bot=config.get("rate_per_bot", 30))
+
+        bots = []
+        for entry in entries:
+            name = entry["name"]
+            token = _secret(entry, "token")
+            if not token:
+                raise ValueError(f"Bot '{name}' has no token (set 'token' or 'token_env')")
+            if not entry.get("github_repo"):
+                raise ValueError(f"Bot '{name}' has no 'github_repo'")
+            github = GitHubIssueManager(
+                github_token=_secret(entry, "github_token"),
+                github_repo=entry["github_repo"],
+                session=session,
+                use_env=False,
+            )
+            client = TelegramClient(token, name=name, session=session, scheduler=scheduler)
+            admin_ids = entry.get("admin_ids") or []
+            if not admin_ids:
+                logger.warning(f"Bot '{name}' has no 'admin_ids': admin commands are disabled")
+            core = BotCore(client, github=github, labels=entry.get("labels"),
+                           templates=entry.get("templates"), admin_ids=admin_ids,
+                           data_dir=os.path.join(data_dir, name))
+            bots.append(PollingTransport(core, elector=elector))
+            logger.info(f"Loaded bot '{name}' (repo {github.github_repo}, "
+                        f"GitHub {'ENABLED' if github.github_token else 'DISABLED'})")
+        return cls(bots, scheduler, elector)
+
+    def run(self) -> None:
+        self.scheduler.start()
+        for bot in self.bots:
+            thread = threading.Thread(target=bot.run, name=f"poll-{bot.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"🚀 Hosting {len(self.bots)} bots. Press Ctrl+C to stop.")
+        try:
+            while any(thread.is_alive() for thread in self._threads):
+                for thread in self._threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.info("👋 Host stopped by user.")
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        for bot in self.bots:
+            bot.stop()
+        for thread in self._threads:
+            thread.join(timeout=15)
+        self.scheduler.stop()
+        if self.elector:
+            self.elector.release()
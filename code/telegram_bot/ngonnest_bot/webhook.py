@@ -0,0 +1,134 @@
+"""
+Webhook transports: a shared request fast path plus a standalone HTTP server.
+
+``WebhookEndpoint`` is used both by the standalone server below and by the
+serverless handler in ``api/bot.py``. Forged and redelivered requests are
+rejected before the body is decoded; an update whose handling failed is
+released, so Telegram's redelivery is processed again.
+"""
+import hmac
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+from . import codec
+from .core import BotCore
+from .dedup import DUPLICATE, IN_FLIGHT, UpdateDeduplicator
+from .profiling import profiler
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def process_webhook(core: BotCore, body: bytes) -> Tuple[int, str]:
+    """Handle one webhook POST body. Returns ``(status_code, response_body)``."""
+    try:
+        # Only "message" and "callback_query" updates are handled: skip decoding the rest.
+        if codec.has_key(body, "message") or codec.has_key(body, "callback_query"):
+            with profiler.sample("webhook"):
+                with profiler.stage("decode"):
+                    update = codec.loads(body)
+                core.handle_update(update)
+        return 200, "ok"
+    except Exception as e:
+        logger.error(f"Error handling request: {e}")
+        return 500, "Internal Server Error"
+
+
+class WebhookEndpoint:
+    """Secret check and update deduplication in front of ``process_webhook``."""
+
+    def __init__(self, core: BotCore, secret: Optional[str] = None,
+                 dedup: Optional[UpdateDeduplicator] = None):
+        self.core = core
+        self.secret = secret.encode("utf-8") if secret else None
+        self.dedup = dedup
+
+    @classmethod
+    def from_env(cls, core: BotCore) -> "WebhookEndpoint":
+        """Configure from TELEGRAM_WEBHOOK_SECRET and DEDUP_* variables."""
+        bot_id = core.client.token.split(":", 1)[0]
+        return cls(core, secret=os.getenv("TELEGRAM_WEBHOOK_SECRET"),
+                   dedup=UpdateDeduplicator.from_env(namespace=bot_id))
+
+    def handle(self, body: bytes, secret_header: Optional[str]) -> Tuple[int, str]:
+        """Handle one webhook POST. Returns ``(status_code, response_body)``."""
+        if self.secret is not None and not hmac.compare_digest(
+            (secret_header or "").encode("utf-8"), self.secret
+        ):
+            logger.warning("Rejected webhook call with invalid secret token")
+            return 401, "Unauthorized"
+
+        update_id = codec.peek_update_id(body)
+        if update_id is None:
+            return 400, "Bad Request"
+        if not self.dedup:
+            return process_webhook(self.core, body)
+
+        claim = self.dedup.claim(update_id)
+        if claim == DUPLICATE:
+            # Acknowledge so Telegram stops redelivering, but don't process twice.
+            logger.info(f"Skipping duplicate update {update_id}")
+            return 200, "ok"
+        if claim == IN_FLIGHT:
+            # Still being handled elsewhere and it may yet fail: have Telegram retry later.
+            logger.info(f"Update {update_id} is already being processed")
+            return 503, "Update In Progress"
+
+        status, text = 500, "Internal Server Error"
+        try:
+            status, text = process_webhook(self.core, body)
+        finally:
+            if 200 <= status < 300:
+                self.dedup.confirm(update_id)
+            else:
+                self.dedup.release(update_id)
+        return status, text
+
+
+class WebhookServer:
+    """Minimal threaded HTTP server receiving Telegram webhook calls."""
+
+    def __init__(self, endpoint: WebhookEndpoint, host: str = "0.0.0.0", port: int = 8080,
+                 path: str = "/webhook"):
+        self.endpoint = endpoint
+        self.path = path
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._reply(200, '{"status":"OK"}')
+
+            def do_POST(self):
+                if self.path != server.path:
+                    self._reply(404, "Not Found")
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                status, text = server.endpoint.handle(
+                    self.rfile.read(length), self.headers.get(SECRET_HEADER)
+                )
+                self._reply(status, text)
+
+            def _reply(self, status: int, text: str):
+                payload = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format, *args)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+
+    def run(self):
+        host, port = self.httpd.server_address[:2]
+        logger.info(f"🌐 Webhook server listening on {host}:{port}{self.path}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("👋 Webhook server stopped by user.")
+        finally:
+            self.httpd.server_close()
@@ -19,6 +19,9 @@ if ([string]::IsNullOrWhiteSpace($VERCEL_URL)) {
     exit 1
 }
 
+# Secret partagé (optionnel, doit correspondre à TELEGRAM_WEBHOOK_SECRET)
+$WEBHOOK_SECRET = Read-Host "🔒 Entrez votre TELEGRAM_WEBHOOK_SECRET (laisser vide pour ignorer)"
+
 # Construire l'URL du webhook
 $WEBHOOK_URL = "$VERCEL_URL/api/bot"
 
@@ -28,6 +31,9 @@ Write-Host "URL: $WEBHOOK_URL"
 
 # Configurer le webhook
 $setWebhookUrl = "https://api.telegram.org/bot$TELEGRAM_TOKEN/setWebhook?url=$WEBHOOK_URL"
+if (-not [string]::IsNullOrWhiteSpace($WEBHOOK_SECRET)) {
+    $setWebhookUrl = "$setWebhookUrl&secret_token=$WEBHOOK_SECRET"
+}
 try {
     $response = Invoke-RestMethod -Uri $setWebhookUrl -Method Post
     Write-Host ""
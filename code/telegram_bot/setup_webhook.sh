@@ -20,6 +20,9 @@ if [ -z "$VERCEL_URL" ]; then
     exit 1
 fi
 
+# Secret partagé (optionnel, doit correspondre à TELEGRAM_WEBHOOK_SECRET)
+read -p "🔒 Entrez votre TELEGRAM_WEBHOOK_SECRET (laisser vide pour ignorer): " WEBHOOK_SECRET
+
 # Construire l'URL du webhook
 WEBHOOK_URL="${VERCEL_URL}/api/bot"
 
@@ -28,7 +31,11 @@ echo "📤 Configuration du webhook..."
 echo "URL: $WEBHOOK_URL"
 
 # Configurer le webhook
-RESPONSE=$(curl -s -X POST "https://api.telegram.org/bot${TELEGRAM_TOKEN}/setWebhook?url=${WEBHOOK_URL}")
+SET_WEBHOOK_URL="https://api.telegram.org/bot${TELEGRAM_TOKEN}/setWebhook?url=${WEBHOOK_URL}"
+if [ -n "$WEBHOOK_SECRET" ]; then
+    SET_WEBHOOK_URL="${SET_WEBHOOK_URL}&secret_token=${WEBHOOK_SECRET}"
+fi
+RESPONSE=$(curl -s -X POST "$SET_WEBHOOK_URL")
 
 echo ""
 echo "📋 Réponse de Telegram:"
@@ -0,0 +1,78 @@
+"""
+Shared fakes for the ngonnest_bot unit tests (run with ``python -m pytest tests``).
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngonnest_bot.client import ApiResponse  # noqa: E402
+from ngonnest_bot.core import BotCore  # noqa: E402
+
+
+class FakeClient:
+    """Stands in for TelegramClient: records outgoing calls instead of sending them."""
+
+    def __init__(self, name: str = "test"):
+        self.name = name
+        self.token = "123:abc"
+        self.session = None
+        self.scheduler = None
+        self.retry_queue = None
+        self.calls = []
+
+    def request(self, method, data=None, timeout=30):
+        self.calls.append((method, data))
+        return ApiResponse({"message_id": len(self.calls)})
+
+    def send(self, method, data):
+        return self.request(method, data)[0]
+
+    def send_message(self, chat_id, text, parse_mode="Markdown", reply_markup=None):
+        data = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+        if reply_markup:
+            data["reply_markup"] = reply_markup
+        return self.send("sendMessage", data)
+
+    @property
+    def messages(self):
+        return [data["text"] for method, data in self.calls if method == "sendMessage"]
+
+
+class FakeGitHub:
+    def __init__(self, fail: bool = False):
+        self.github_token = "token"
+        self.github_repo = "Ken-Andre/ngonnest"
+        self.fail = fail
+        self.issues = []
+
+    def create_issue(self, title, body, labels=None):
+        if self.fail:
+            return None
+        self.issues.append({"title": title, "body": body, "labels": labels})
+        number = len(self.issues)
+        return {"number": number, "html_url": f"https://github.com/{self.github_repo}/issues/{number}"}
+
+
+def message_update(text, user_id=42, chat_id=42, update_id=1):
+    return {
+        "update_id": update_id,
+        "message": {"chat": {"id": chat_id}, "from": {"id": user_id, "username": "alice"}, "text": text},
+    }
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def github():
+    return FakeGitHub()
+
+
+@pytest.fixture
+def core(client, github):
+    return BotCore(client, github=github)
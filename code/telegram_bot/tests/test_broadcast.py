@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+
+from conftest import FakeClient
+from ngonnest_bot.broadcast import Broadcaster
+from ngonnest_bot.client import ApiResponse
+from ngonnest_bot.subscribers import SubscriberStore
+
+
+ADMIN = 999
+
+
+class SlowClient(FakeClient):
+    """API with a fixed round trip, answering 429 once for the chats in ``flood``."""
+
+    def __init__(self, latency=0.0, flood=(), blocked=()):
+        super().__init__()
+        self.latency = latency
+        self.flood = set(flood)
+        self.blocked = set(blocked)
+        self.delivered = []
+        self._lock = threading.Lock()
+
+    def request(self, method, data=None, timeout=30):
+        if data["chat_id"] == ADMIN:
+            return super().request(method, data, timeout)
+        time.sleep(self.latency)
+        chat_id = data["chat_id"]
+        with self._lock:
+            if chat_id in self.flood:
+                self.flood.discard(chat_id)
+                return ApiResponse(None, 429, 1)
+            if chat_id in self.blocked:
+                return ApiResponse(None, 403)
+            self.delivered.append(chat_id)
+        return ApiResponse({"message_id": 1})
+
+
+def make_broadcaster(tmp_path, client, subscribers, **kwargs):
+    store = SubscriberStore(str(tmp_path / "subscribers.bin"))
+    for chat_id in subscribers:
+        store.add(chat_id)
+    return Broadcaster(client, store, str(tmp_path / "broadcast.json"), **kwargs), store
+
+
+def wait_done(broadcaster, timeout=15):
+    deadline = time.monotonic() + timeout
+    while broadcaster.running and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not broadcaster.running
+
+
+def test_rate_is_reached_despite_api_latency(tmp_path):
+    client = SlowClient(latency=0.15)
+    broadcaster, _ = make_broadcaster(tmp_path, client, range(1, 76), rate=25, chunk_size=50)
+
+    started = time.monotonic()
+    assert broadcaster.start("hello", admin_chat_id=ADMIN)
+    wait_done(broadcaster)
+    elapsed = time.monotonic() - started
+
+    assert sorted(client.delivered) == list(range(1, 76))
+    # 75 messages at 25/s with a burst of 25: ~2 s. Sequential sends would take > 11 s.
+    assert elapsed < 4.5
+    assert not os.path.exists(tmp_path / "broadcast.json")
+
+
+def test_429_waits_for_retry_after_instead_of_failing(tmp_path):
+    client = SlowClient(flood={2}, blocked={3})
+    broadcaster, store = make_broadcaster(tmp_path, client, [1, 2, 3])
+
+    started = time.monotonic()
+    broadcaster.start("hello", admin_chat_id=ADMIN)
+    wait_done(broadcaster)
+
+    assert sorted(client.delivered) == [1, 2]
+    assert time.monotonic() - started >= 1
+    assert 3 not in store
+    summary = client.messages[-1]
+    assert "Envoyés : 2" in summary and "Bloqués (désabonnés) : 1" in summary and "Échecs : 0" in summary
+
+
+def test_cancel_returns_at_once_and_the_worker_deletes_the_state(tmp_path):
+    client = SlowClient(latency=0.5)
+    broadcaster, _ = make_broadcaster(tmp_path, client, range(1, 200), rate=25, chunk_size=10)
+    broadcaster.start("hello", admin_chat_id=ADMIN)
+    time.sleep(0.2)
+
+    started = time.monotonic()
+    assert broadcaster.cancel()
+    assert time.monotonic() - started < 0.1
+    wait_done(broadcaster)
+
+    assert not os.path.exists(tmp_path / "broadcast.json")
+    assert len(client.delivered) < 199
+    # Nothing to resume after a restart.
+    assert not broadcaster.resume()
+
+
+def test_cancel_without_worker_drops_saved_progress(tmp_path):
+    broadcaster, _ = make_broadcaster(tmp_path, SlowClient(), [1])
+    (tmp_path / "broadcast.json").write_text('{"offset": 0}')
+
+    assert broadcaster.cancel()
+    assert not os.path.exists(tmp_path / "broadcast.json")
+    assert not broadcaster.cancel()
+
+
+def test_stop_keeps_progress_for_the_next_leader(tmp_path):
+    client = SlowClient(latency=0.05)
+    broadcaster, store = make_broadcaster(tmp_path, client, range(1, 101), rate=50, chunk_size=10)
+    broadcaster.start("hello", admin_chat_id=ADMIN)
+    time.sleep(0.3)
+    broadcaster.stop()
+    assert not broadcaster.running
+    assert os.path.exists(tmp_path / "broadcast.json")
+
+    # The next leader has its own store on the same file, as after a failover.
+    successor_store = SubscriberStore(str(tmp_path / "subscribers.bin"))
+    successor = Broadcaster(client, successor_store, str(tmp_path / "broadcast.json"), rate=200)
+    assert successor.resume()
+    wait_done(successor)
+    # At-least-once: the chunk in flight at the handover may be sent twice.
+    assert set(client.delivered) == set(range(1, 101))
+
+
+def test_stop_waits_for_sends_in_flight_and_prunes_blocked_chats(tmp_path):
+    client = SlowClient(latency=0.3, blocked=range(1, 11))
+    broadcaster, store = make_broadcaster(tmp_path, client, range(1, 11), rate=2, chunk_size=10)
+    broadcaster.start("hello", admin_chat_id=ADMIN)
+    time.sleep(0.1)  # two sends in flight, the rest waiting for tokens
+
+    broadcaster.stop()
+    assert not broadcaster.running
+    assert 1 not in store and 2 not in store
+    assert 3 in store
+    with open(tmp_path / "broadcast.json") as f:
+        assert json.load(f)["offset"] == 0
+
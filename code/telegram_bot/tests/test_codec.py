@@ -0,0 +1,46 @@
+import json
+
+from conftest import message_update
+from ngonnest_bot import codec
+
+
+def raw(update):
+    return json.dumps(update).encode("utf-8")
+
+
+def test_has_key_finds_handled_update_types():
+    assert codec.has_key(raw(message_update("/help")), "message")
+    callback = {"update_id": 2, "callback_query": {"id": "1", "data": "faq"}}
+    assert codec.has_key(raw(callback), "callback_query")
+    assert not codec.has_key(raw(callback), "message")
+
+
+def test_has_key_ignores_longer_keys_containing_the_name():
+    edited = {"update_id": 3, "edited_message": {"message_id": 9, "text": "hi",
+                                                 "reply_to_message": {"message_id": 8}}}
+    assert not codec.has_key(raw(edited), "message")
+
+
+def test_has_key_ignores_a_quoted_key_inside_a_text_value():
+    # The quotes are escaped in the raw body, so neither token matches the text.
+    body = raw({"channel_post": {"text": 'il a écrit "message" et "update_id": 99'}, "update_id": 4})
+    assert not codec.has_key(body, "message")
+    assert codec.peek_update_id(body) == 4
+
+
+def test_peek_update_id():
+    assert codec.peek_update_id(b'{"update_id" : 123456789, "message": {}}') == 123456789
+    assert codec.peek_update_id(raw(message_update("/start", update_id=77))) == 77
+
+
+def test_peek_update_id_without_an_id():
+    assert codec.peek_update_id(b'{"message": {"text": "update_id"}}') is None
+    assert codec.peek_update_id(b'{"update_id": null}') is None
+    assert codec.peek_update_id(b"") is None
+
+
+def test_dumps_returns_utf8_bytes_that_loads_reads_back():
+    data = {"chat_id": 1, "text": "Bienvenue 🏠 à NgonNest"}
+    encoded = codec.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert codec.loads(encoded) == data
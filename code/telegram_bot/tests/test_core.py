@@ -0,0 +1,127 @@
+"""
+Routing parity with the original single-file bot (main.TelegramBot) and the
+webhook entry point.
+"""
+import json
+
+import pytest
+
+from conftest import FakeGitHub, message_update
+from ngonnest_bot.core import BotCore
+from ngonnest_bot.webhook import process_webhook
+
+
+def callback_update(data, chat_id=42, user_id=42):
+    return {"update_id": 2, "callback_query": {
+        "id": "cb1", "data": data, "from": {"id": user_id},
+        "message": {"chat": {"id": chat_id}},
+    }}
+
+
+@pytest.fixture
+def stateful(client, github, tmp_path):
+    return BotCore(client, github=github, data_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize("command, first_line", [
+    ("/start", "🏠 *Bienvenue sur NgonNest Bot !*"),
+    ("/help", "🤖 *Commandes NgonNest Bot*"),
+    ("/status", "📊 *État du Bot NgonNest*"),
+    ("/cancel", "ℹ️ Aucune opération en cours."),
+    ("/nope", "❓ *Commande inconnue*"),
+])
+def test_commands_answer_like_the_original_bot(core, client, command, first_line):
+    core.handle_update(message_update(command))
+    assert client.messages[-1].split("\n")[0] == first_line
+
+
+def test_status_reports_the_github_repo(core, client):
+    core.handle_update(message_update("/status"))
+    assert "🐙 GitHub: ✅ Connecté" in client.messages[-1]
+    assert "📝 Repo: `Ken-Andre/ngonnest`" in client.messages[-1]
+
+
+def test_feedback_conversation_creates_an_issue(stateful, client, github):
+    stateful.handle_update(message_update("/feedback"))
+    assert client.messages[-1].startswith("💡 *Envoyer un feedback*")
+    stateful.handle_update(message_update("Une recherche dans l'inventaire"))
+
+    issue, = github.issues
+    assert issue["title"] == "[FEEDBACK] Suggestion de alice"
+    assert issue["labels"] == ["feedback", "user-request", "enhancement"]
+    assert "Une recherche dans l'inventaire" in issue["body"]
+    assert "📋 **Numéro de suivi :** #1" in client.messages[-1]
+    assert stateful.user_states == {}
+
+
+@pytest.mark.parametrize("description, title, labels", [
+    ("Le bouton est mal aligné", "🟡 [BUG-NORMAL] Signalement de alice", ["bug"]),
+    ("Erreur à l'ouverture", "🔴 [BUG-HIGH] Signalement de alice", ["bug", "high-priority"]),
+    ("Crash au démarrage", "🚨 [BUG-URGENT] Signalement de alice", ["bug", "urgent", "priority-urgent"]),
+])
+def test_bug_priority_comes_from_keywords(stateful, github, description, title, labels):
+    stateful.handle_update(message_update("/bug"))
+    stateful.handle_update(message_update(description))
+    assert github.issues == [{"title": title, "body": github.issues[0]["body"], "labels": labels}]
+
+
+def test_cancel_drops_the_pending_operation(stateful, client, github):
+    stateful.handle_update(message_update("/bug"))
+    stateful.handle_update(message_update("/cancel"))
+    assert client.messages[-1].startswith("❌ Opération *bug* annulée.")
+    stateful.handle_update(message_update("Crash"))
+    assert client.messages[-1].startswith("🤔 Je ne comprends pas ce message.")
+    assert github.issues == []
+
+
+def test_github_failure_is_reported_to_the_user(client):
+    core = BotCore(client, github=FakeGitHub(fail=True))
+    core.handle_update(message_update("/feedback Une idée"))
+    assert client.messages[-1].startswith("❌ *Erreur lors de l'envoi*")
+
+
+def test_start_has_the_inline_menu(core, client):
+    core.handle_update(message_update("/start"))
+    method, data = client.calls[-1]
+    buttons = [button["callback_data"] for row in data["reply_markup"]["inline_keyboard"] for button in row]
+    assert buttons == ["help", "quickstart", "faq"]
+
+
+@pytest.mark.parametrize("data, first_line", [
+    ("help", "🤖 *Commandes NgonNest Bot*"),
+    ("quickstart", "🚀 *Démarrage rapide*"),
+    ("faq", "❓ *FAQ NgonNest Bot*"),
+])
+def test_menu_buttons_answer_and_acknowledge(core, client, data, first_line):
+    core.handle_update(callback_update(data))
+    assert client.messages[-1].split("\n")[0] == first_line
+    assert client.calls[-1] == ("answerCallbackQuery", {"callback_query_id": "cb1"})
+
+
+def test_without_data_dir_reports_need_the_one_line_form(core, client, github):
+    core.handle_update(message_update("/bug"))
+    assert client.messages[-1].startswith("🐛 *Signaler un bug*\n\nDécrivez le problème sur la même ligne")
+    assert core.user_states == {}
+
+    core.handle_update(message_update("/bug@NgonNestBot Plantage au démarrage"))
+    assert github.issues[0]["title"] == "🚨 [BUG-URGENT] Signalement de alice"
+    assert "Plantage au démarrage" in github.issues[0]["body"]
+
+
+def test_process_webhook_status_codes(core, client):
+    assert process_webhook(core, b'{"update_id": 1, "edited_message": {}}') == (200, "ok")
+    assert client.calls == []
+
+    assert process_webhook(core, json.dumps(message_update("/help")).encode("utf-8")) == (200, "ok")
+    assert client.messages[-1].startswith("🤖 *Commandes NgonNest Bot*")
+
+    # Missing "chat": the handler raises, Telegram must redeliver.
+    assert process_webhook(core, b'{"update_id": 3, "message": {"text": "/help"}}')[0] == 500
+
+
+def test_broadcast_strips_the_bot_mention(client, github, tmp_path):
+    core = BotCore(client, github=github, admin_ids=[42], data_dir=str(tmp_path))
+    core.subscribers.add(7)
+    core.handle_update(message_update("/broadcast@NgonNestBot Nouvelle version"))
+    core.broadcaster.stop()
+    assert client.calls[0] == ("sendMessage", {"chat_id": 42, "text": "Nouvelle version", "parse_mode": "Markdown"})
@@ -0,0 +1,76 @@
+import os
+import time
+
+from ngonnest_bot.events import COMMAND, RECORD, EventLog, command_code
+
+
+def test_records_are_fixed_12_byte_structs(tmp_path):
+    log = EventLog(str(tmp_path))
+    log.activate()
+    log.record_command("bug")
+    log.record_issue("bug-urgent", 2.5)
+
+    with open(tmp_path / "events.log", "rb") as f:
+        data = f.read()
+    assert RECORD.size == 12 and len(data) == 24
+    (ts, kind, detail, _, value), (_, _, _, _, latency) = RECORD.iter_unpack(data)
+    assert (kind, detail, value) == (COMMAND, command_code("bug"), 0)
+    assert latency == 2500
+
+
+def test_summary_comes_from_hourly_rollups(tmp_path):
+    log = EventLog(str(tmp_path))
+    log.activate()
+    now = time.time()
+    log.record(COMMAND, command_code("feedback"), timestamp=now - 3600 * 30)
+    for seconds in (10, 20, 30):
+        log.record_command("bug")
+        log.record(2, 3, seconds * 1000, timestamp=now - 60)  # bug-urgent
+
+    day = log.summary(24, now=now)
+    assert day["issues"]["bug-urgent"] == 3
+    assert 18 <= day["median_latency"] <= 23
+    assert log.summary(24 * 7, now=now)["commands"]["feedback"] == 1
+    assert log.daily_issues(7, now=now)[-1]["bugs"] == 3
+
+
+def test_rollups_are_rebuilt_from_the_log(tmp_path):
+    log = EventLog(str(tmp_path))
+    log.activate()
+    for _ in range(5):
+        log.record_command("start")
+    log.deactivate()
+    os.remove(tmp_path / "rollups.json")
+
+    rebuilt = EventLog(str(tmp_path))
+    rebuilt.activate()
+    assert rebuilt.summary(1)["commands"]["start"] == 5
+
+
+def test_standby_catches_up_on_takeover_without_double_counting(tmp_path):
+    leader = EventLog(str(tmp_path))
+    standby = EventLog(str(tmp_path))  # built at startup, before the leader's events
+    leader.activate()
+    for _ in range(3):
+        leader.record_command("help")
+    leader.deactivate()
+
+    standby.activate()
+    standby.record_command("help")
+    assert standby.summary(1)["commands"]["help"] == 4
+    standby.deactivate()
+
+    restarted = EventLog(str(tmp_path))
+    restarted.activate()
+    assert restarted.summary(1)["commands"]["help"] == 4
+
+
+def test_events_appended_by_another_writer_are_folded_in(tmp_path):
+    first, second = EventLog(str(tmp_path)), EventLog(str(tmp_path))
+    first.activate()
+    first.record_command("help")
+    second.record_command("status")  # e.g. a demoted instance finishing an update
+    first.record_command("help")
+
+    commands = first.summary(1)["commands"]
+    assert commands["help"] == 2 and commands["status"] == 1
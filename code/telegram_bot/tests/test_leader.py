@@ -0,0 +1,129 @@
+import threading
+import time
+
+from conftest import FakeClient
+from ngonnest_bot.client import ApiResponse
+from ngonnest_bot.leader import LeaderElector, LeaseBackend
+from ngonnest_bot.polling import PollingTransport
+
+TTL = 0.3
+
+
+class MemoryLease(LeaseBackend):
+    """In-memory lease shared by the electors of one test."""
+
+    def __init__(self):
+        self.holder = None
+        self.expires_at = 0.0
+        self.renewals = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self, holder_id, ttl):
+        with self._lock:
+            now = time.monotonic()
+            if self.holder not in (None, holder_id) and self.expires_at > now:
+                return False
+            if self.holder == holder_id:
+                self.renewals += 1
+            self.holder, self.expires_at = holder_id, now + ttl
+            return True
+
+    def release(self, holder_id):
+        with self._lock:
+            if self.holder == holder_id:
+                self.holder = None
+
+    def steal(self, holder_id="intruder", ttl=60.0):
+        with self._lock:
+            self.holder, self.expires_at = holder_id, time.monotonic() + ttl
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_heartbeat_renews_the_lease_while_the_leader_is_busy():
+    lease = MemoryLease()
+    leader = LeaderElector(lease, ttl=TTL, holder_id="a")
+    other = LeaderElector(lease, ttl=TTL, holder_id="b")
+    assert leader.ensure_leadership()
+    leader.start_heartbeat()
+    try:
+        # The leader's main loop is stuck (e.g. a slow GitHub call) for several TTLs.
+        deadline = time.monotonic() + TTL * 3
+        while time.monotonic() < deadline:
+            assert not other.ensure_leadership()
+            time.sleep(TTL / 5)
+        assert lease.renewals >= 3
+    finally:
+        leader.release()
+    assert other.ensure_leadership()
+
+
+def test_standby_takes_over_once_the_lease_expires():
+    lease = MemoryLease()
+    leader = LeaderElector(lease, ttl=TTL, holder_id="a")
+    standby = LeaderElector(lease, ttl=TTL, holder_id="b")
+    assert leader.ensure_leadership()  # then dies without renewing or releasing
+    assert not standby.ensure_leadership()
+
+    assert wait_for(standby.ensure_leadership, timeout=TTL * 3)
+    assert lease.holder == "b"
+
+
+def test_heartbeat_notices_a_lost_lease():
+    lease = MemoryLease()
+    leader = LeaderElector(lease, ttl=TTL, holder_id="a")
+    assert leader.ensure_leadership()
+    leader.start_heartbeat()
+    try:
+        lease.steal()
+        assert wait_for(lambda: not leader.is_leader, timeout=TTL * 3)
+    finally:
+        leader.release()
+
+
+class IdleClient(FakeClient):
+    def request(self, method, data=None, timeout=30):
+        time.sleep(0.01)
+        return ApiResponse([])
+
+
+class JobsCore:
+    def __init__(self):
+        self.client = IdleClient()
+        self.name = "test"
+        self.events = []
+
+    def handle_update(self, update):
+        pass
+
+    def resume_background_jobs(self):
+        self.events.append("resume")
+
+    def stop_background_jobs(self):
+        self.events.append("stop")
+
+
+def test_polling_stops_jobs_on_demotion_and_resumes_them_on_promotion():
+    lease = MemoryLease()
+    core = JobsCore()
+    transport = PollingTransport(core, elector=LeaderElector(lease, ttl=TTL, holder_id="a"))
+    thread = threading.Thread(target=transport.run, daemon=True)
+    thread.start()
+    try:
+        assert wait_for(lambda: core.events == ["resume"])
+
+        lease.steal(ttl=TTL)
+        assert wait_for(lambda: core.events == ["resume", "stop"])
+
+        # The intruder's lease expires without renewal: this instance leads again.
+        assert wait_for(lambda: core.events == ["resume", "stop", "resume"])
+    finally:
+        transport.stop()
+        thread.join(5)
+    assert core.events == ["resume", "stop", "resume", "stop"]
+    assert lease.holder is None
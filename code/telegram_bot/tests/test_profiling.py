@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import message_update
+from ngonnest_bot.client import TelegramClient
+from ngonnest_bot.profiling import profiler
+from ngonnest_bot.scheduler import OutboundScheduler
+
+
+class FakeResponse:
+    status_code = 200
+    content = b'{"ok": true, "result": {"message_id": 1}}'
+
+
+class FakeSession:
+    def post(self, url, data=None, headers=None, timeout=None):
+        return FakeResponse()
+
+
+@pytest.fixture
+def sampling():
+    profiler.reset()
+    profiler.configure(True, 1.0)
+    yield profiler
+    profiler.configure(False)
+    profiler.reset()
+
+
+def test_route_and_handler_are_sibling_stages(sampling, core):
+    with profiler.sample("update"):
+        core.handle_update(message_update("/help"))
+
+    assert {"update", "update;route", "update;handler"} <= set(profiler.wall)
+    assert "update;route;handler" not in profiler.wall
+
+
+def test_send_stage_is_recorded_on_the_scheduler_worker(sampling):
+    scheduler = OutboundScheduler(workers=1)
+    scheduler.start()
+    try:
+        client = TelegramClient("123:abc", session=FakeSession(), scheduler=scheduler)
+        with profiler.sample("update"):
+            future = client.send_message(1, "hi")
+        assert future.result(timeout=5) == {"message_id": 1}
+    finally:
+        scheduler.stop()
+
+    assert {"update;outbound", "update;outbound;send", "update;outbound;decode"} <= set(profiler.wall)
+    # The worker's share is not counted as another sampled update.
+    assert profiler.samples == 1
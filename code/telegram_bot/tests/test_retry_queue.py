@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+
+from ngonnest_bot.client import ApiResponse
+from ngonnest_bot.retry_queue import RetryQueue
+
+
+class FakeApi:
+    """Fails the first ``failures`` calls with ``error``, then succeeds."""
+
+    def __init__(self, failures=0, error=ApiResponse(None, 502), block=False):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+        self.delivered = threading.Event()
+        self.blocked = threading.Event() if block else None
+
+    def __call__(self, method, data):
+        self.calls.append((method, data, time.monotonic()))
+        if self.blocked:
+            self.blocked.wait(5)
+        if len(self.calls) <= self.failures:
+            return self.error
+        self.delivered.set()
+        return ApiResponse({"message_id": 1})
+
+
+def message(text, chat_id=1):
+    return {"chat_id": chat_id, "text": text}
+
+
+def on_disk(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_backoff_grows_exponentially_with_jitter_and_a_cap(tmp_path):
+    queue = RetryQueue(FakeApi(), str(tmp_path / "outbox.json"), base_delay=2, max_delay=60)
+    for attempts in range(4):
+        delay = queue._delay(attempts)
+        assert 2 * 2 ** attempts * 0.5 <= delay <= 2 * 2 ** attempts
+    assert 30 <= queue._delay(20) <= 60
+
+
+def test_failed_call_is_retried_until_delivered(tmp_path):
+    api = FakeApi(failures=2)
+    path = tmp_path / "outbox.json"
+    queue = RetryQueue(api, str(path), base_delay=0.01)
+    queue.start()
+    try:
+        assert queue.enqueue("sendMessage", message("hi"))
+        assert not queue.enqueue("sendMessage", message("hi"))
+        assert api.delivered.wait(5)
+        time.sleep(0.05)
+        assert len(api.calls) == 3
+        assert on_disk(path) == []
+    finally:
+        queue.stop()
+
+
+def test_retry_after_is_honoured(tmp_path):
+    api = FakeApi(failures=1, error=ApiResponse(None, 429, 0.3))
+    queue = RetryQueue(api, str(tmp_path / "outbox.json"), base_delay=0.01)
+    queue.start()
+    try:
+        queue.enqueue("sendMessage", message("hi"))
+        assert api.delivered.wait(5)
+        first, second = api.calls[0][2], api.calls[1][2]
+        assert second - first >= 0.3
+    finally:
+        queue.stop()
+
+
+def test_overflow_drops_the_oldest_call(tmp_path):
+    path = tmp_path / "outbox.json"
+    queue = RetryQueue(FakeApi(), str(path), max_size=2, base_delay=60)
+    queue.start()
+    try:
+        time.sleep(0.05)
+        for text in ("a", "b", "c"):
+            queue.enqueue("sendMessage", message(text))
+        assert [entry["data"]["text"] for entry in on_disk(path)] == ["b", "c"]
+    finally:
+        queue.stop()
+
+
+def test_standby_reloads_the_leaders_outbox_on_takeover(tmp_path):
+    path = str(tmp_path / "outbox.json")
+    leader = RetryQueue(FakeApi(), path, base_delay=60, name="leader")
+    standby = RetryQueue(FakeApi(), path, base_delay=60, name="standby")  # built at startup, idle
+
+    leader.start()
+    time.sleep(0.05)
+    leader.enqueue("sendMessage", message("from leader"))
+    # A standby failing a send meanwhile must not clobber the leader's outbox.
+    standby.enqueue("sendMessage", message("from standby"))
+    assert [entry["data"]["text"] for entry in on_disk(path)] == ["from leader"]
+
+    leader.stop()
+    standby.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(on_disk(path)) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert sorted(entry["data"]["text"] for entry in on_disk(path)) == ["from leader", "from standby"]
+    finally:
+        standby.stop()
+
+
+def test_outbox_stays_locked_while_the_owner_is_active(tmp_path):
+    path = str(tmp_path / "outbox.json")
+    api = FakeApi()
+    owner = RetryQueue(FakeApi(), path, base_delay=60)
+    owner.start()
+    time.sleep(0.05)
+    owner.enqueue("sendMessage", message("pending"))
+
+    other = RetryQueue(api, path, base_delay=60)
+    other.LOCK_POLL_INTERVAL = 0.05
+    other.start()
+    try:
+        time.sleep(0.3)
+        assert len(other) == 0
+        owner.stop()
+        deadline = time.monotonic() + 5
+        while len(other) == 0 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert len(other) == 1
+    finally:
+        other.stop()
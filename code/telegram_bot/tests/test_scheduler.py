@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from ngonnest_bot.scheduler import OutboundScheduler, TokenBucket
+
+
+def run_jobs(scheduler, jobs):
+    """Submit ``(bot, label)`` jobs before starting, return the labels in execution order."""
+    done = []
+    lock = threading.Lock()
+
+    def job(label):
+        with lock:
+            done.append(label)
+
+    futures = [scheduler.submit(bot, job, label) for bot, label in jobs]
+    scheduler.start()
+    try:
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        scheduler.stop()
+    return done
+
+
+def test_bots_are_served_round_robin():
+    scheduler = OutboundScheduler(workers=1, rate_per_bot=1000)
+    for bot in ("busy", "quiet"):
+        scheduler.register(bot)
+    jobs = [("busy", f"b{i}") for i in range(10)] + [("quiet", "q0"), ("quiet", "q1")]
+
+    # The quiet bot doesn't wait behind the busy bot's backlog.
+    assert run_jobs(scheduler, jobs)[:5] == ["b0", "q0", "b1", "q1", "b2"]
+
+
+def test_rate_limit_is_per_bot():
+    scheduler = OutboundScheduler(workers=2, rate_per_bot=5)
+    for bot in ("busy", "quiet"):
+        scheduler.register(bot)
+    finished = {}
+    started = time.monotonic()
+
+    def job(label):
+        finished[label] = time.monotonic() - started
+
+    futures = [scheduler.submit("busy", job, f"b{i}") for i in range(10)]
+    futures.append(scheduler.submit("quiet", job, "q0"))
+    scheduler.start()
+    try:
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        scheduler.stop()
+
+    # A burst of 5, then 5 more at 5/s.
+    assert finished["b9"] >= 0.8
+    assert finished["q0"] < 0.3
+
+
+def test_results_and_errors_reach_the_caller():
+    scheduler = OutboundScheduler(workers=1)
+    scheduler.register("bot")
+    scheduler.start()
+    try:
+        assert scheduler.submit("bot", lambda x: x * 2, 21).result(timeout=5) == 42
+        with pytest.raises(ZeroDivisionError):
+            scheduler.submit("bot", lambda: 1 / 0).result(timeout=5)
+        with pytest.raises(KeyError):
+            scheduler.submit("unknown", print)
+    finally:
+        scheduler.stop()
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(2)
+    now = bucket.updated_at
+    assert bucket.try_take(now) and bucket.try_take(now)
+    assert not bucket.try_take(now)
+    assert bucket.wait_time() == pytest.approx(0.5)
+    assert bucket.try_take(now + 0.5)
@@ -0,0 +1,95 @@
+"""
+On-disk formats shared between instances and across upgrades.
+"""
+import json
+import struct
+import time
+
+from ngonnest_bot.leader import FileLeaseBackend, LeaderElector
+from ngonnest_bot.retry_queue import RetryQueue
+from ngonnest_bot.subscribers import SubscriberStore
+
+
+def test_subscribers_are_little_endian_int64_records(tmp_path):
+    path = tmp_path / "subscribers.bin"
+    store = SubscriberStore(str(path))
+    for chat_id in (1, -1001234567890, 3):
+        store.add(chat_id)
+    store.remove(1)
+
+    assert struct.unpack("<3q", path.read_bytes()) == (0, -1001234567890, 3)
+    assert set(SubscriberStore(str(path))._index) == {-1001234567890, 3}
+
+    store.compact()
+    assert struct.unpack("<2q", path.read_bytes()) == (-1001234567890, 3)
+
+
+def test_partial_subscriber_record_is_truncated(tmp_path):
+    path = tmp_path / "subscribers.bin"
+    path.write_bytes(struct.pack("<q", 7) + b"\x01\x02")
+    assert 7 in SubscriberStore(str(path))
+    assert path.stat().st_size == 8
+
+
+def test_standby_store_sees_the_leaders_subscribers_after_takeover(tmp_path):
+    path = str(tmp_path / "subscribers.bin")
+    leader = SubscriberStore(path)
+    standby = SubscriberStore(path)  # built at startup, before the leader's writes
+    leader.add(1)
+    leader.add(2)
+
+    standby.reload()
+    assert standby.add(3)
+    assert standby.remove(3)
+    assert not standby.add(1)
+    standby.compact()
+
+    assert list(SubscriberStore(path).iter_chunks()) == [(2, [1, 2])]
+    assert 1 in standby and 2 in standby and 3 not in standby
+
+
+def test_stores_sharing_the_file_catch_up_before_writing(tmp_path):
+    path = str(tmp_path / "subscribers.bin")
+    first, second = SubscriberStore(path), SubscriberStore(path)
+    first.add(1)
+    second.add(2)  # no reload: the append by ``first`` is picked up under the file lock
+    assert second.remove_many([1, 2]) == 2
+    assert not first.remove(1)  # already zeroed by ``second``
+    first.compact()
+    assert list(SubscriberStore(path).iter_chunks()) == []
+    assert second.add(4)
+    assert list(SubscriberStore(path).iter_chunks()) == [(1, [4])]
+
+
+def test_lease_is_a_json_record(tmp_path):
+    path = tmp_path / "leader.lock"
+    elector = LeaderElector(FileLeaseBackend(str(path)), ttl=30, holder_id="host:1")
+    assert elector.ensure_leadership()
+    record = json.loads(path.read_text())
+    assert record["holder"] == "host:1" and record["expires_at"] > 0
+
+    other = LeaderElector(FileLeaseBackend(str(path)), ttl=30, holder_id="host:2")
+    assert not other.ensure_leadership()
+
+    elector.release()
+    assert json.loads(path.read_text()) == {}
+    assert other.ensure_leadership()
+
+
+def test_outbox_is_a_json_list_of_calls(tmp_path):
+    path = tmp_path / "outbox.json"
+    path.write_text(json.dumps([{"key": "k1", "method": "sendMessage", "data": {"chat_id": 1, "text": "hi"},
+                                 "attempts": 2, "next_at": 4102444800.0}]))
+    queue = RetryQueue(lambda method, data: (None, None, None), str(path))
+    queue.start()
+    try:
+        queue.enqueue("sendMessage", {"chat_id": 2, "text": "yo"})
+        deadline = time.time() + 5
+        # Activation happens on the worker thread, which then merges both calls.
+        while len(json.loads(path.read_text())) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        entries = json.loads(path.read_text())
+    finally:
+        queue.stop()
+    assert [entry["data"]["chat_id"] for entry in entries] == [1, 2]
+    assert set(entries[1]) == {"key", "method", "data", "attempts", "next_at"}
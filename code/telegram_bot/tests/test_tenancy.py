@@ -0,0 +1,74 @@
+import json
+import logging
+import os
+
+import pytest
+
+from ngonnest_bot.tenancy import BotHost
+
+
+@pytest.fixture(autouse=True)
+def global_settings(monkeypatch):
+    """Single-bot settings that must not leak into hosted bots."""
+    monkeypatch.setenv("GITHUB_TOKEN", "global-github-token")
+    monkeypatch.setenv("GITHUB_REPO", "someone/else")
+    monkeypatch.setenv("ADMIN_IDS", "1,2")
+    monkeypatch.setenv("TOKEN_MAIN", "111:main")
+    monkeypatch.delenv("UNSET_TOKEN", raising=False)
+
+
+def write_config(tmp_path, bots, **extra):
+    path = tmp_path / "bots.json"
+    path.write_text(json.dumps({"data_dir": str(tmp_path / "data"), "bots": bots, **extra}))
+    return str(path)
+
+
+def test_each_bot_gets_its_own_settings(tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN_PRO", "pro-github-token")
+    path = write_config(tmp_path, [
+        {"name": "main", "token_env": "TOKEN_MAIN", "github_repo": "org/main", "admin_ids": [7]},
+        {"name": "pro", "token": "222:pro", "github_token_env": "GITHUB_TOKEN_PRO",
+         "github_repo": "org/pro", "admin_ids": [8],
+         "labels": {"bug": ["bug", "pro"]}, "templates": {"start": "Pro !"}},
+    ], outbound_workers=2, rate_per_bot=10)
+
+    host = BotHost.from_config(path)
+    main, pro = (bot.core for bot in host.bots)
+
+    assert main.client.token == "111:main" and pro.client.token == "222:pro"
+    assert main.data_dir == os.path.join(str(tmp_path / "data"), "main")
+    assert pro.subscribers.path == os.path.join(str(tmp_path / "data"), "pro", "subscribers.bin")
+    assert pro.github.github_token == "pro-github-token" and pro.github.github_repo == "org/pro"
+    assert pro.labels["bug"] == ["bug", "pro"] and pro.labels["feedback"] == main.labels["feedback"]
+    assert pro.templates["start"] == "Pro !" and main.templates["help"] == pro.templates["help"]
+    assert (main.admin_ids, pro.admin_ids) == ({7}, {8})
+
+    assert main.client.scheduler is pro.client.scheduler is host.scheduler
+    assert host.scheduler.workers == 2 and host.scheduler.rate_per_bot == 10
+    assert main.client.session is pro.client.session
+
+
+def test_global_github_and_admin_settings_are_not_inherited(tmp_path, caplog):
+    path = write_config(tmp_path, [{"name": "main", "token_env": "TOKEN_MAIN", "github_repo": "org/main"}])
+
+    with caplog.at_level(logging.WARNING):
+        core = BotHost.from_config(path).bots[0].core
+
+    assert core.github.github_token is None
+    assert core.admin_ids == set()
+    assert "no 'admin_ids'" in caplog.text
+
+
+@pytest.mark.parametrize("entry, error", [
+    ({"name": "main", "github_repo": "org/main"}, "has no token"),
+    ({"name": "main", "token_env": "UNSET_TOKEN", "github_repo": "org/main"}, "has no token"),
+    ({"name": "main", "token_env": "TOKEN_MAIN"}, "has no 'github_repo'"),
+])
+def test_incomplete_entries_are_rejected(tmp_path, entry, error):
+    with pytest.raises(ValueError, match=error):
+        BotHost.from_config(write_config(tmp_path, [entry]))
+
+
+def test_empty_config_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="No bots"):
+        BotHost.from_config(write_config(tmp_path, []))
@@ -0,0 +1,115 @@
+import json
+import threading
+
+from conftest import message_update
+from ngonnest_bot.dedup import RedisDedupBackend, UpdateDeduplicator
+from ngonnest_bot.webhook import WebhookEndpoint
+
+
+class FlakyCore:
+    """Core whose handler fails the first ``failures`` times."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.handled = []
+
+    def handle_update(self, update):
+        self.handled.append(update["update_id"])
+        if len(self.handled) <= self.failures:
+            raise RuntimeError("boom")
+
+
+class BlockingCore:
+    def __init__(self):
+        self.entered = threading.Event()
+        self.proceed = threading.Event()
+        self.handled = 0
+
+    def handle_update(self, update):
+        self.handled += 1
+        self.entered.set()
+        self.proceed.wait(5)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def body(update_id=7):
+    return json.dumps(message_update("/help", update_id=update_id)).encode("utf-8")
+
+
+def test_failed_update_is_processed_again_on_redelivery():
+    core = FlakyCore(failures=1)
+    endpoint = WebhookEndpoint(core, dedup=UpdateDeduplicator())
+
+    assert endpoint.handle(body(), None)[0] == 500
+    assert endpoint.handle(body(), None) == (200, "ok")
+    assert core.handled == [7, 7]
+    # Now confirmed: further redeliveries are acknowledged without processing.
+    assert endpoint.handle(body(), None) == (200, "ok")
+    assert core.handled == [7, 7]
+
+
+def test_concurrent_redelivery_is_skipped_until_the_first_attempt_finishes():
+    core = BlockingCore()
+    endpoint = WebhookEndpoint(core, dedup=UpdateDeduplicator())
+    first = []
+    thread = threading.Thread(target=lambda: first.append(endpoint.handle(body(), None)))
+    thread.start()
+    assert core.entered.wait(5)
+
+    status, _ = endpoint.handle(body(), None)
+    assert status == 503
+    core.proceed.set()
+    thread.join(5)
+
+    assert first == [(200, "ok")]
+    assert endpoint.handle(body(), None) == (200, "ok")
+    assert core.handled == 1
+
+
+def test_redis_claim_is_deleted_on_failure_and_shared_once_confirmed():
+    redis = FakeRedis()
+    core = FlakyCore(failures=1)
+    endpoint = WebhookEndpoint(core, dedup=UpdateDeduplicator(backend=RedisDedupBackend(client=redis)))
+
+    assert endpoint.handle(body(), None)[0] == 500
+    assert redis.data == {}
+    assert endpoint.handle(body(), None) == (200, "ok")
+    assert list(redis.data.values()) == [RedisDedupBackend.DONE_VALUE]
+
+    # Another instance sharing the same Redis skips the redelivery.
+    other = FlakyCore()
+    other_endpoint = WebhookEndpoint(other, dedup=UpdateDeduplicator(backend=RedisDedupBackend(client=redis)))
+    assert other_endpoint.handle(body(), None) == (200, "ok")
+    assert other.handled == []
+
+
+def test_expired_claim_can_be_taken_again():
+    dedup = UpdateDeduplicator(claim_ttl=0)
+    assert dedup.claim(1) == "claimed"
+    assert dedup.claim(1) == "claimed"
+
+
+def test_secret_and_update_id_are_checked_before_processing():
+    core = FlakyCore()
+    endpoint = WebhookEndpoint(core, secret="s3cret", dedup=UpdateDeduplicator())
+
+    assert endpoint.handle(body(), "wrong")[0] == 401
+    assert endpoint.handle(b'{"message": {}}', "s3cret")[0] == 400
+    assert endpoint.handle(body(), "s3cret") == (200, "ok")
+    assert core.handled == [7]